@@ -0,0 +1,129 @@
+"""
+On-disk JSON cache shared by the check modules.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+# Prefer orjson for cache (de)serialization, falling back to stdlib json
+try:
+    import orjson
+    _loads, _dumps = orjson.loads, orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(data) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _cache_path(cache_dir: str, name: str) -> Path:
+    """Get the cache file path for a named cache."""
+    return Path(cache_dir).expanduser() / f"{name}.json"
+
+
+def load(cache_dir: str, name: str, max_age_hours: float,
+         now: float | None = None) -> dict:
+    """
+    Load a named cache if it exists and is not expired.
+
+    Args:
+        cache_dir: Cache directory (may contain ~)
+        name: Cache name, used as the file stem
+        max_age_hours: Maximum age of the cache file
+        now: Current time as a Unix timestamp (default: time.time())
+
+    Returns:
+        The cached data, or an empty dict if missing, stale or unreadable.
+    """
+    path = _cache_path(cache_dir, name)
+    if now is None:
+        now = time.time()
+
+    try:
+        age_hours = (now - path.stat().st_mtime) / 3600
+
+        if age_hours > max_age_hours:
+            return {}
+
+        return _loads(path.read_bytes())
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def save(cache_dir: str, name: str, data: dict):
+    """
+    Save a named cache atomically.
+
+    The data is written to a temporary file and renamed over the cache,
+    so an interrupted write never leaves a truncated cache behind.
+    """
+    path = _cache_path(cache_dir, name)
+    tmp_path = path.with_suffix(".tmp")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(_dumps(data))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# A last-good value is reused for at most this many multiples of its TTL
+DEFAULT_MAX_STALE_FACTOR = 10
+
+
+def get_or_fetch(cache_dir: str, name: str, key: str, max_age_hours: float,
+                 fetch: Callable[[], Any], enabled: bool = True,
+                 max_stale_hours: float = 0) -> tuple[Any, float | None]:
+    """
+    Return a cached value if fresh, otherwise fetch and cache it.
+
+    If fetching fails and a value for the same key was cached no more than
+    max_stale_hours ago, that last-good value is returned instead of raising.
+
+    Args:
+        cache_dir: Cache directory (may contain ~)
+        name: Cache name, used as the file stem
+        key: Identifies what was fetched (e.g. host); other keys are ignored
+        max_age_hours: Maximum age of a cached value before refetching
+        fetch: Callable returning JSON-serializable data
+        enabled: If False, always fetch and never touch the cache
+        max_stale_hours: Maximum age of a last-good value to fall back to
+            (0 disables the fallback)
+
+    Returns:
+        Tuple of (value, stale_hours) where stale_hours is the age of the
+        last-good value if the fetch failed, or None if the value is fresh
+
+    Raises:
+        Whatever fetch raises, if no usable cached value is available
+    """
+    if not enabled:
+        return fetch(), None
+
+    now = time.time()
+    cached = load(cache_dir, name, max(max_age_hours, max_stale_hours), now)
+    has_entry = cached.get("key") == key and "value" in cached
+    age_hours = (now - cached.get("ts", 0)) / 3600
+
+    if has_entry and age_hours <= max_age_hours:
+        return cached["value"], None
+
+    try:
+        value = fetch()
+    except Exception:
+        if has_entry and age_hours <= max_stale_hours:
+            return cached["value"], age_hours
+        raise
+
+    save(cache_dir, name, {"key": key, "ts": now, "value": value})
+    return value, None
+
+
+def stale_limit(cache_config: dict, max_age_hours: float) -> float:
+    """Get how long a last-good value may be reused, from the cache config."""
+    factor = cache_config.get("max_stale_factor", DEFAULT_MAX_STALE_FACTOR)
+    return max_age_hours * factor
@@ -2,14 +2,44 @@
 SSL/TLS certificate expiration checks.
 """
 
+import asyncio
 import socket
 import ssl
 from datetime import datetime, timezone
+from functools import lru_cache
 from urllib.parse import urlparse
 
 from output import CheckResult, Status
 
+# Try to import cryptography, but make it optional
+try:
+    from cryptography import x509
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
 
+
+# Loading the system CA store is the expensive part of creating a context,
+# so build it once and share it across every check. Certificates are always
+# verified, so untrusted or mismatched certs are reported as errors.
+_SSL_CTX = ssl.create_default_context()
+
+# When verification fails, a second handshake without verification still
+# reads the expiry date. An unverified peer cert is only available in DER
+# form, so this needs cryptography to decode it.
+if CRYPTOGRAPHY_AVAILABLE:
+    _NO_VERIFY_CTX = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    _NO_VERIFY_CTX.check_hostname = False
+    _NO_VERIFY_CTX.verify_mode = ssl.CERT_NONE
+
+# getpeercert() always formats dates with English month abbreviations
+_MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+
+@lru_cache(maxsize=1024)
 def _parse_cert_target(target: str) -> tuple[str, int]:
     """Parse a certificate target into host and port."""
     # Handle URLs
@@ -37,35 +67,99 @@ def _parse_cert_target(target: str) -> tuple[str, int]:
     return target, 443
 
 
-def _get_cert_expiry(host: str, port: int, timeout: int = 10) -> tuple[bool, str, datetime | None]:
+def _parse_cert_date(value: str) -> datetime:
+    """Parse an OpenSSL notAfter date such as 'Dec 31 23:59:59 2025 GMT'."""
+    try:
+        mon, day, clock, year, _ = value.split()
+        hour, minute, second = clock.split(":")
+        return datetime(int(year), _MONTHS[mon], int(day),
+                        int(hour), int(minute), int(second),
+                        tzinfo=timezone.utc)
+    except (KeyError, ValueError):
+        expiry = datetime.strptime(value, "%b %d %H:%M:%S %Y %Z")
+        return expiry.replace(tzinfo=timezone.utc)
+
+
+async def _resolve_host(host: str) -> str | None:
+    """Resolve a hostname to a single IP address, or None on failure."""
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return infos[0][4][0]
+    except (OSError, UnicodeError, ValueError, IndexError):
+        # A name that fails IDNA encoding raises UnicodeError rather than
+        # gaierror; either way only this endpoint should fail
+        return None
+
+
+def _read_expiry(ssl_object) -> tuple[bool, str, datetime | None]:
+    """Read the expiry date from an established, verified TLS connection."""
+    cert = ssl_object.getpeercert()
+
+    if not cert:
+        return False, "No certificate returned", None
+
+    # Parse expiry date
+    expiry_str = cert.get("notAfter", "")
+    if not expiry_str:
+        return False, "No expiry date in certificate", None
+
+    return True, "", _parse_cert_date(expiry_str)
+
+
+async def _open_tls(host: str, port: int, context: ssl.SSLContext,
+                    timeout: int, ip: str | None):
+    """Complete a TLS handshake and return the stream writer."""
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(
+            ip or host, port,
+            ssl=context,
+            server_hostname=host,
+            ssl_handshake_timeout=timeout
+        ),
+        timeout=timeout
+    )
+    return writer
+
+
+async def _get_unverified_expiry(host: str, port: int, timeout: int,
+                                 ip: str | None) -> datetime | None:
+    """Read a certificate's expiry without verifying it, or None on failure."""
+    if not CRYPTOGRAPHY_AVAILABLE:
+        return None
+
+    try:
+        writer = await _open_tls(host, port, _NO_VERIFY_CTX, timeout, ip)
+    except Exception:
+        return None
+
+    try:
+        der = writer.get_extra_info("ssl_object").getpeercert(binary_form=True)
+        if not der:
+            return None
+        return x509.load_der_x509_certificate(der).not_valid_after_utc
+    except Exception:
+        return None
+    finally:
+        writer.transport.abort()
+
+
+async def _get_cert_expiry(host: str, port: int, timeout: int = 10,
+                           ip: str | None = None) -> tuple[bool, str, datetime | None]:
     """
     Get certificate expiry date for a host:port.
 
+    If ip is given, connect to it directly; the hostname is still used
+    for SNI.
+
     Returns:
-        Tuple of (success, error_message, expiry_datetime)
+        Tuple of (success, error_message, expiry_datetime). If the
+        certificate fails verification, success is False but the expiry
+        is still returned when it can be read.
     """
-    context = ssl.create_default_context()
-
     try:
-        with socket.create_connection((host, port), timeout=timeout) as sock:
-            with context.wrap_socket(sock, server_hostname=host) as ssock:
-                cert = ssock.getpeercert()
-
-                if not cert:
-                    return False, "No certificate returned", None
-
-                # Parse expiry date
-                expiry_str = cert.get("notAfter", "")
-                if not expiry_str:
-                    return False, "No expiry date in certificate", None
-
-                # Format: 'Dec 31 23:59:59 2025 GMT'
-                expiry = datetime.strptime(expiry_str, "%b %d %H:%M:%S %Y %Z")
-                expiry = expiry.replace(tzinfo=timezone.utc)
-
-                return True, "", expiry
-
-    except socket.timeout:
+        writer = await _open_tls(host, port, _SSL_CTX, timeout, ip)
+    except asyncio.TimeoutError:
         return False, "Connection timed out", None
     except socket.gaierror:
         return False, "DNS resolution failed", None
@@ -73,12 +167,48 @@ def _get_cert_expiry(host: str, port: int, timeout: int = 10) -> tuple[bool, str
         return False, "Connection refused", None
     except ssl.SSLCertVerificationError as e:
         # Still try to get expiry even if cert is invalid
-        return False, f"Certificate error: {str(e)[:50]}", None
+        reason = e.verify_message or str(e)
+        expiry = await _get_unverified_expiry(host, port, timeout, ip)
+        return False, f"Certificate error: {reason[:50]}", expiry
     except ssl.SSLError as e:
         return False, f"SSL error: {str(e)[:50]}", None
     except Exception as e:
         return False, f"Error: {str(e)[:50]}", None
 
+    try:
+        return _read_expiry(writer.get_extra_info("ssl_object"))
+    except Exception as e:
+        return False, f"Error: {str(e)[:50]}", None
+    finally:
+        # We only wanted the handshake; skip the TLS close_notify exchange
+        writer.transport.abort()
+
+
+async def _check_endpoint(endpoint: tuple[str, int],
+                          ip: str | None) -> tuple[bool, str, datetime | None]:
+    """Fetch the certificate expiry for a (host, port) endpoint."""
+    if ip is None:
+        return False, "DNS resolution failed", None
+
+    host, port = endpoint
+    return await _get_cert_expiry(host, port, ip=ip)
+
+
+async def _check_endpoints(
+    endpoints: list[tuple[str, int]]
+) -> dict[tuple[str, int], tuple[bool, str, datetime | None]]:
+    """Check all endpoints concurrently on a single event loop."""
+    # Resolve each host once, even if it serves several ports
+    hosts = list({host for host, _ in endpoints})
+    resolved = dict(zip(hosts, await asyncio.gather(
+        *(_resolve_host(host) for host in hosts)
+    )))
+
+    checked = await asyncio.gather(
+        *(_check_endpoint(ep, resolved[ep[0]]) for ep in endpoints)
+    )
+    return dict(zip(endpoints, checked))
+
 
 def check_certificates(targets: list[str], thresholds: dict) -> list[CheckResult]:
     """
@@ -103,6 +233,9 @@ def check_certificates(targets: list[str], thresholds: dict) -> list[CheckResult
     warnings = []
     errors = []
 
+    # Targets naming the same endpoint share one certificate, so fetch and
+    # count each endpoint once; dict keys keep first-seen order
+    endpoints: dict[tuple[str, int], None] = {}
     for target in targets:
         host, port = _parse_cert_target(target)
 
@@ -110,11 +243,20 @@ def check_certificates(targets: list[str], thresholds: dict) -> list[CheckResult
             errors.append(f"{target}: Invalid target")
             continue
 
-        display_name = f"{host}:{port}" if port != 443 else host
+        endpoints[(host, port)] = None
 
-        success, error_msg, expiry = _get_cert_expiry(host, port)
+    checked = {}
+    if endpoints:
+        checked = asyncio.run(_check_endpoints(list(endpoints)))
+
+    for host, port in endpoints:
+        success, error_msg, expiry = checked[(host, port)]
+        display_name = f"{host}:{port}" if port != 443 else host
 
         if not success:
+            if expiry is not None:
+                # The certificate is untrusted, but its expiry is still useful
+                error_msg += f", expires {expiry:%Y-%m-%d}"
             errors.append(f"{display_name}: {error_msg}")
             continue
 
@@ -133,9 +275,9 @@ def check_certificates(targets: list[str], thresholds: dict) -> list[CheckResult
         else:
             ok_count += 1
 
-    # Build results
+    # Build results; every count is per certificate (plus invalid targets)
     results = []
-    total = len(targets)
+    total = ok_count + len(warnings) + len(errors)
 
     if errors:
         result = CheckResult(
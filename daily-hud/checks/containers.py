@@ -5,88 +5,74 @@ Container image vulnerability checks using Trivy.
 import json
 import os
 import subprocess
-from datetime import datetime, timezone
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import cache
 from output import CheckResult, Status
 
+# Try to import ijson, but make it optional
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
-def _get_cache_path(cache_dir: str) -> Path:
-    """Get the cache file path for container scan data."""
-    cache_path = Path(cache_dir).expanduser() / "container_vulns.json"
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    return cache_path
 
+def _image_key(image: str, image_id: str) -> str:
+    """
+    Return the cache/scan key for a running container image.
 
-def _load_cache(cache_path: Path, max_age_hours: int) -> dict:
-    """Load cached vulnerability data if not expired."""
-    if not cache_path.exists():
-        return {}
-
-    try:
-        mtime = datetime.fromtimestamp(cache_path.stat().st_mtime, tz=timezone.utc)
-        age_hours = (datetime.now(timezone.utc) - mtime).total_seconds() / 3600
-
-        if age_hours > max_age_hours:
-            return {}
-
-        with open(cache_path, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
-
+    Tags are mutable, so prefer the digest-qualified reference from the
+    container status (e.g. "docker.io/library/nginx@sha256:...").
+    """
+    if "@sha256:" in image_id:
+        # Strip runtime prefixes such as "docker-pullable://"
+        return image_id.split("://", 1)[-1]
+    return image
 
-def _save_cache(cache_path: Path, data: dict):
-    """Save vulnerability data to cache."""
-    try:
-        with open(cache_path, "w") as f:
-            json.dump(data, f)
-    except OSError:
-        pass
 
+def _get_running_images() -> dict[str, str]:
+    """
+    Get container images currently running in Kubernetes.
 
-def _get_running_images() -> list[str]:
-    """Get list of container images currently running in Kubernetes."""
+    Returns:
+        Dict mapping image key (digest where known) to the image reference
+    """
     try:
         result = subprocess.run(
-            ["kubectl", "get", "pods", "-A", "-o",
-             "jsonpath={range .items[*]}{range .spec.containers[*]}{.image}{'\\n'}{end}{end}"],
+            ["kubectl", "get", "pods", "-A", "-o", "json", "--chunk-size=500"],
             capture_output=True,
             text=True,
             timeout=30
         )
 
         if result.returncode != 0:
-            return []
+            return {}
 
-        # Deduplicate images
-        images = set()
-        for line in result.stdout.strip().split("\n"):
-            if line.strip():
-                images.add(line.strip())
+        data = json.loads(result.stdout)
 
-        return list(images)
+    except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError):
+        return {}
 
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        return []
+    # Deduplicate images by digest
+    images = {}
+    for pod in data.get("items", []):
+        for cs in pod.get("status", {}).get("containerStatuses", []):
+            image = cs.get("image", "")
+            if image:
+                images.setdefault(_image_key(image, cs.get("imageID", "")), image)
 
+    return images
 
-def _scan_image_trivy(image: str, timeout: int = 120) -> dict:
-    """
-    Scan a container image using Trivy.
 
-    Returns:
-        Dict with vulnerability counts by severity
-    """
+def _scan_buffered(cmd: list[str], timeout: int) -> dict:
+    """Run Trivy, then parse its full JSON report in one go."""
     try:
         result = subprocess.run(
-            [
-                "trivy", "image",
-                "--format", "json",
-                "--severity", "CRITICAL,HIGH,MEDIUM",
-                "--quiet",
-                image
-            ],
+            cmd,
             capture_output=True,
             text=True,
             timeout=timeout
@@ -116,6 +102,95 @@ def _scan_image_trivy(image: str, timeout: int = 120) -> dict:
         return {"error": "Invalid scan output"}
 
 
+def _scan_streaming(cmd: list[str], timeout: int) -> dict:
+    """Run Trivy and count severities as the JSON report streams in."""
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        return {"error": "Trivy not found"}
+
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+
+    counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0}
+    parse_failed = False
+
+    try:
+        for severity in ijson.items(
+            proc.stdout, "Results.item.Vulnerabilities.item.Severity"
+        ):
+            if severity in counts:
+                counts[severity] += 1
+    except ijson.JSONError:
+        parse_failed = True
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        returncode = proc.wait()
+
+    if timed_out.is_set():
+        return {"error": "Scan timed out"}
+    if returncode != 0:
+        return {"error": "Scan failed"}
+    if parse_failed:
+        return {"error": "Invalid scan output"}
+
+    return counts
+
+
+def _update_trivy_db(trivy_cache: Path, timeout: int = 180) -> bool:
+    """Download the Trivy vulnerability DB once before scanning."""
+    try:
+        result = subprocess.run(
+            [
+                "trivy", "image",
+                "--cache-dir", str(trivy_cache),
+                "--download-db-only",
+                "--quiet"
+            ],
+            capture_output=True,
+            timeout=timeout
+        )
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
+
+def _scan_image_trivy(image: str, trivy_cache: Path, skip_db_update: bool,
+                      timeout: int = 120) -> dict:
+    """
+    Scan a container image using Trivy.
+
+    Returns:
+        Dict with vulnerability counts by severity
+    """
+    cmd = [
+        "trivy", "image",
+        "--format", "json",
+        "--severity", "CRITICAL,HIGH,MEDIUM",
+        "--cache-dir", str(trivy_cache),
+        "--quiet",
+    ]
+    if skip_db_update:
+        cmd.append("--skip-db-update")
+    cmd.append(image)
+
+    # Large images can produce multi-MB reports; stream them when possible
+    if IJSON_AVAILABLE:
+        return _scan_streaming(cmd, timeout)
+    return _scan_buffered(cmd, timeout)
+
+
 def _check_trivy_available() -> bool:
     """Check if Trivy is installed."""
     try:
@@ -129,6 +204,26 @@ def _check_trivy_available() -> bool:
         return False
 
 
+def _fresh_entries(cached_data: dict, now: float, success_hours: float,
+                   error_hours: float) -> dict:
+    """
+    Drop cache entries older than their own TTL.
+
+    Failed scans get a short TTL so an unreachable registry isn't retried
+    (and timed out) on every run, but is retried soon.
+    """
+    fresh = {}
+
+    for image, entry in cached_data.items():
+        if not isinstance(entry, dict) or "ts" not in entry:
+            continue
+        ttl_hours = error_hours if "error" in entry else success_hours
+        if now - entry["ts"] <= ttl_hours * 3600:
+            fresh[image] = entry
+
+    return fresh
+
+
 def check_containers(config: dict, cache_config: dict) -> list[CheckResult]:
     """
     Check container images for vulnerabilities.
@@ -159,13 +254,17 @@ def check_containers(config: dict, cache_config: dict) -> list[CheckResult]:
     # Handle caching
     use_cache = cache_config.get("enabled", True)
     cache_dir = cache_config.get("directory", "~/.cache/daily-hud")
-    cache_hours = cache_config.get("durations", {}).get("container_vulns", 6)
+    durations = cache_config.get("durations", {})
+    cache_hours = durations.get("container_vulns", 6)
+    error_hours = durations.get("container_errors", 0.25)
 
+    now = time.time()
     cached_data = {}
-    cache_path = None
     if use_cache:
-        cache_path = _get_cache_path(cache_dir)
-        cached_data = _load_cache(cache_path, cache_hours)
+        cached_data = _fresh_entries(
+            cache.load(cache_dir, "container_vulns", max(cache_hours, error_hours), now),
+            now, cache_hours, error_hours
+        )
 
     # Get running images
     images = _get_running_images()
@@ -178,7 +277,39 @@ def check_containers(config: dict, cache_config: dict) -> list[CheckResult]:
         )]
 
     # Limit to a reasonable number of images
-    images = images[:10]
+    images = dict(list(images.items())[:10])
+
+    # Only cold images go to the scanner pool
+    image_counts = {}
+    to_scan = []
+    for image in images:
+        entry = cached_data.get(image)
+        if entry is None:
+            to_scan.append(image)
+        elif "error" in entry:
+            image_counts[image] = {"error": entry["error"]}
+        else:
+            image_counts[image] = entry["counts"]
+
+    if to_scan:
+        # Refresh the DB once up front so parallel scans don't each fetch it
+        trivy_cache = Path(cache_dir).expanduser() / "trivy"
+        db_ready = _update_trivy_db(trivy_cache)
+
+        with ThreadPoolExecutor(max_workers=min(4, len(to_scan))) as executor:
+            futures = {
+                executor.submit(_scan_image_trivy, image, trivy_cache, db_ready): image
+                for image in to_scan
+            }
+            for future in as_completed(futures):
+                image = futures[future]
+                counts = future.result()
+                image_counts[image] = counts
+                if use_cache:
+                    if "error" in counts:
+                        cached_data[image] = {"error": counts["error"], "ts": now}
+                    else:
+                        cached_data[image] = {"counts": counts, "ts": now}
 
     total_critical = 0
     total_high = 0
@@ -186,19 +317,11 @@ def check_containers(config: dict, cache_config: dict) -> list[CheckResult]:
     errors = []
     scanned = 0
 
-    for image in images:
-        # Check cache first
-        if image in cached_data and "error" not in cached_data[image]:
-            counts = cached_data[image]
-        else:
-            counts = _scan_image_trivy(image)
-            if use_cache and cache_path:
-                if image not in cached_data:
-                    cached_data[image] = {}
-                cached_data[image] = counts
+    for image, image_ref in images.items():
+        counts = image_counts[image]
 
         if "error" in counts:
-            errors.append(f"{image}: {counts['error']}")
+            errors.append(f"{image_ref}: {counts['error']}")
             continue
 
         scanned += 1
@@ -207,8 +330,8 @@ def check_containers(config: dict, cache_config: dict) -> list[CheckResult]:
         total_medium += counts.get("MEDIUM", 0)
 
     # Save cache
-    if use_cache and cache_path:
-        _save_cache(cache_path, cached_data)
+    if use_cache:
+        cache.save(cache_dir, "container_vulns", cached_data)
 
     # Build result
     if scanned == 0:
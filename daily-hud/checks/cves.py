@@ -2,57 +2,82 @@
 CVE advisory checks using OSV.dev API.
 """
 
-import json
 import os
+import re
 import subprocess
-from datetime import datetime, timezone
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+import cache
 from output import CheckResult, Status
 
 
-OSV_API_URL = "https://api.osv.dev/v1/query"
+OSV_QUERYBATCH_URL = "https://api.osv.dev/v1/querybatch"
+OSV_VULN_URL = "https://api.osv.dev/v1/vulns/{}"
 
+DPKG_STATUS_PATH = Path("/var/lib/dpkg/status")
 
-def _get_cache_path(cache_dir: str) -> Path:
-    """Get the cache file path for CVE data."""
-    cache_path = Path(cache_dir).expanduser() / "cves.json"
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    return cache_path
+# Packages worth querying OSV for, matched as substrings of package names
+_IMPORTANT_PACKAGES = [
+    "openssl", "openssh", "curl", "wget", "bash", "sudo",
+    "git", "python3", "python", "nodejs", "nginx", "apache2",
+    "httpd", "postgresql", "mysql", "mariadb", "redis",
+    "docker", "containerd", "linux-image"
+]
+_IMPORTANT_RE = re.compile(
+    "|".join(map(re.escape, _IMPORTANT_PACKAGES)), re.IGNORECASE
+)
 
+# Reuse keep-alive connections to api.osv.dev across all queries
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
 
-def _load_cache(cache_path: Path, max_age_hours: int) -> dict:
-    """Load cached CVE data if not expired."""
-    if not cache_path.exists():
-        return {}
-
-    try:
-        mtime = datetime.fromtimestamp(cache_path.stat().st_mtime, tz=timezone.utc)
-        age_hours = (datetime.now(timezone.utc) - mtime).total_seconds() / 3600
-
-        if age_hours > max_age_hours:
-            return {}
-
-        with open(cache_path, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
 
+def _read_dpkg_status(status_path: Path = DPKG_STATUS_PATH) -> list[dict]:
+    """Read installed packages straight from the dpkg status database."""
+    packages = []
 
-def _save_cache(cache_path: Path, data: dict):
-    """Save CVE data to cache."""
     try:
-        with open(cache_path, "w") as f:
-            json.dump(data, f)
+        text = status_path.read_text(encoding="utf-8", errors="replace")
     except OSError:
-        pass
+        return packages
+
+    for paragraph in text.split("\n\n"):
+        name = version = status = ""
+        for line in paragraph.split("\n"):
+            if line.startswith("Package: "):
+                name = line[9:].strip()
+            elif line.startswith("Version: "):
+                version = line[9:].strip()
+            elif line.startswith("Status: "):
+                status = line[8:].strip()
+
+        if name and version and status.endswith(" installed"):
+            packages.append({
+                "name": name,
+                "version": version,
+                "ecosystem": "Debian"
+            })
+
+    return packages
 
 
 def _get_local_packages() -> list[dict]:
     """Get installed packages on the local system."""
-    packages = []
+    # Parsing the dpkg database directly avoids forking dpkg-query
+    packages = _read_dpkg_status()
+    if packages:
+        return packages
 
     # Try dpkg (Debian/Ubuntu)
     try:
@@ -103,66 +128,114 @@ def _get_local_packages() -> list[dict]:
     return packages
 
 
-def _query_osv(package: dict) -> list[dict]:
-    """Query OSV.dev for vulnerabilities affecting a package."""
+def _summarize_vuln(vuln: dict, package_name: str) -> dict:
+    """Reduce a full OSV vulnerability record to the fields we report."""
+    # Get severity
+    severity = "unknown"
+    for s in vuln.get("severity", []):
+        if s.get("type") == "CVSS_V3":
+            score = s.get("score", "")
+            if score:
+                try:
+                    # Extract base score from CVSS vector
+                    # or use the numeric score if provided
+                    severity = _classify_cvss(float(score) if score.replace(".", "").isdigit() else 5.0)
+                except ValueError:
+                    severity = "medium"
+
+    # Check for fix
+    has_fix = False
+    for affected in vuln.get("affected", []):
+        for r in affected.get("ranges", []):
+            if r.get("events"):
+                for event in r["events"]:
+                    if "fixed" in event:
+                        has_fix = True
+                        break
+
+    return {
+        "id": vuln.get("id", "Unknown"),
+        "summary": vuln.get("summary", "")[:80],
+        "severity": severity,
+        "has_fix": has_fix,
+        "package": package_name
+    }
+
+
+def _fetch_vuln(vuln_id: str) -> Optional[dict]:
+    """Fetch the full OSV record for a vulnerability ID."""
+    try:
+        response = _SESSION.get(OSV_VULN_URL.format(vuln_id), timeout=10)
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except requests.exceptions.RequestException:
+        return None
+
+
+def _query_osv(packages: list[dict]) -> tuple[list[dict], list[str]]:
+    """
+    Query OSV.dev for vulnerabilities affecting a set of packages.
+
+    Returns:
+        Tuple of (vulns, failed) where failed lists "ID (package)" for each
+        advisory whose full record could not be fetched
+    """
+    if not packages:
+        return [], []
+
     try:
         payload = {
-            "package": {
-                "name": package["name"],
-                "ecosystem": package["ecosystem"]
-            },
-            "version": package["version"]
+            "queries": [
+                {
+                    "package": {
+                        "name": package["name"],
+                        "ecosystem": package["ecosystem"]
+                    },
+                    "version": package["version"]
+                }
+                for package in packages
+            ]
         }
 
-        response = requests.post(
-            OSV_API_URL,
+        response = _SESSION.post(
+            OSV_QUERYBATCH_URL,
             json=payload,
-            timeout=10
+            timeout=30
         )
 
         if response.status_code != 200:
-            return []
-
-        data = response.json()
-        vulns = data.get("vulns", [])
-
-        results = []
-        for vuln in vulns:
-            # Get severity
-            severity = "unknown"
-            for s in vuln.get("severity", []):
-                if s.get("type") == "CVSS_V3":
-                    score = s.get("score", "")
-                    if score:
-                        try:
-                            # Extract base score from CVSS vector
-                            # or use the numeric score if provided
-                            severity = _classify_cvss(float(score) if score.replace(".", "").isdigit() else 5.0)
-                        except ValueError:
-                            severity = "medium"
-
-            # Check for fix
-            has_fix = False
-            for affected in vuln.get("affected", []):
-                for r in affected.get("ranges", []):
-                    if r.get("events"):
-                        for event in r["events"]:
-                            if "fixed" in event:
-                                has_fix = True
-                                break
-
-            results.append({
-                "id": vuln.get("id", "Unknown"),
-                "summary": vuln.get("summary", "")[:80],
-                "severity": severity,
-                "has_fix": has_fix,
-                "package": package["name"]
-            })
+            return [], []
 
-        return results
+        batch_results = response.json().get("results", [])
 
     except requests.exceptions.RequestException:
-        return []
+        return [], []
+
+    # The batch endpoint only returns IDs, so map each ID to the packages
+    # it affects and fetch the full records once per ID
+    affected = {}
+    for package, batch_result in zip(packages, batch_results):
+        for vuln in batch_result.get("vulns") or []:
+            affected.setdefault(vuln["id"], []).append(package["name"])
+
+    if not affected:
+        return [], []
+
+    with ThreadPoolExecutor(max_workers=min(8, len(affected))) as executor:
+        records = dict(zip(affected, executor.map(_fetch_vuln, affected)))
+
+    results = []
+    failed = []
+    for vuln_id, package_names in affected.items():
+        vuln = records[vuln_id]
+        if vuln is None:
+            failed.extend(f"{vuln_id} ({name})" for name in package_names)
+            continue
+        for package_name in package_names:
+            results.append(_summarize_vuln(vuln, package_name))
+
+    return results, failed
 
 
 def _classify_cvss(score: float) -> str:
@@ -199,12 +272,11 @@ def check_cves(config: dict, cache_config: dict) -> list[CheckResult]:
     cache_hours = cache_config.get("durations", {}).get("cves", 12)
 
     cached_data = {}
-    cache_path = None
     if use_cache:
-        cache_path = _get_cache_path(cache_dir)
-        cached_data = _load_cache(cache_path, cache_hours)
+        cached_data = cache.load(cache_dir, "cves", cache_hours)
 
     # If we have valid cache, use it
+    failed = []
     if cached_data.get("vulns"):
         vulns = cached_data["vulns"]
     else:
@@ -220,28 +292,18 @@ def check_cves(config: dict, cache_config: dict) -> list[CheckResult]:
 
         # Query OSV for a sample of important packages
         # (Checking all packages would be too slow)
-        important_packages = [
-            "openssl", "openssh", "curl", "wget", "bash", "sudo",
-            "git", "python3", "python", "nodejs", "nginx", "apache2",
-            "httpd", "postgresql", "mysql", "mariadb", "redis",
-            "docker", "containerd", "linux-image"
-        ]
-
-        vulns = []
         packages_to_check = [
             p for p in packages
-            if any(imp in p["name"].lower() for imp in important_packages)
+            if _IMPORTANT_RE.search(p["name"])
         ][:20]  # Limit to 20 packages
 
-        for package in packages_to_check:
-            package_vulns = _query_osv(package)
-            vulns.extend(package_vulns)
+        vulns, failed = _query_osv(packages_to_check)
 
-        # Cache results
-        if use_cache and cache_path:
-            _save_cache(cache_path, {"vulns": vulns})
+        # Cache results, unless some advisories are missing their details
+        if use_cache and not failed:
+            cache.save(cache_dir, "cves", {"vulns": vulns})
 
-    if not vulns:
+    if not vulns and not failed:
         return [CheckResult(
             name="cves",
             status=Status.OK,
@@ -249,20 +311,24 @@ def check_cves(config: dict, cache_config: dict) -> list[CheckResult]:
         )]
 
     # Group by severity
-    critical = [v for v in vulns if v["severity"] == "critical"]
-    high = [v for v in vulns if v["severity"] == "high"]
-    medium = [v for v in vulns if v["severity"] == "medium"]
-    low = [v for v in vulns if v["severity"] == "low"]
+    buckets = defaultdict(list)
+    for v in vulns:
+        buckets[v["severity"]].append(v)
+
+    critical = buckets["critical"]
+    high = buckets["high"]
+    medium = buckets["medium"]
+    low = buckets["low"]
 
-    # Determine overall status
+    # Determine overall status; advisories we couldn't look up may be severe
     if critical:
         status = Status.ERROR
-    elif high:
+    elif high or failed:
         status = Status.WARNING
     else:
         status = Status.OK
 
-    total = len(vulns)
+    total = len(vulns) + len(failed)
     result = CheckResult(
         name="cves",
         status=status,
@@ -270,14 +336,20 @@ def check_cves(config: dict, cache_config: dict) -> list[CheckResult]:
     )
 
     # Add details for critical and high
-    for vuln in (critical + high)[:10]:
+    urgent = critical + high
+    for vuln in urgent[:10]:
         fix_str = " - update available" if vuln["has_fix"] else ""
         result.add_detail(f"{vuln['id']}: {vuln['package']} ({vuln['severity']}){fix_str}")
 
-    if len(critical + high) > 10:
-        result.add_detail(f"... and {len(critical + high) - 10} more high/critical")
+    if len(urgent) > 10:
+        result.add_detail(f"... and {len(urgent) - 10} more high/critical")
 
     if medium or low:
         result.add_detail(f"Plus {len(medium)} medium, {len(low)} low severity")
 
+    if failed:
+        shown = ", ".join(failed[:5])
+        more = f" and {len(failed) - 5} more" if len(failed) > 5 else ""
+        result.add_detail(f"Could not fetch details for {shown}{more}")
+
     return [result]
@@ -3,10 +3,10 @@ Domain expiration checks via WHOIS.
 """
 
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from pathlib import Path
 
+import cache
 from output import CheckResult, Status
 
 # Try to import whois, but make it optional
@@ -17,40 +17,6 @@ except ImportError:
     WHOIS_AVAILABLE = False
 
 
-def _get_cache_path(cache_dir: str) -> Path:
-    """Get the cache file path for domain data."""
-    cache_path = Path(cache_dir).expanduser() / "domains.json"
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    return cache_path
-
-
-def _load_cache(cache_path: Path, max_age_hours: int) -> dict:
-    """Load cached domain data if not expired."""
-    if not cache_path.exists():
-        return {}
-
-    try:
-        mtime = datetime.fromtimestamp(cache_path.stat().st_mtime, tz=timezone.utc)
-        age_hours = (datetime.now(timezone.utc) - mtime).total_seconds() / 3600
-
-        if age_hours > max_age_hours:
-            return {}
-
-        with open(cache_path, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
-
-
-def _save_cache(cache_path: Path, data: dict):
-    """Save domain data to cache."""
-    try:
-        with open(cache_path, "w") as f:
-            json.dump(data, f)
-    except OSError:
-        pass
-
-
 def _get_domain_expiry(domain: str) -> tuple[bool, str, datetime | None]:
     """
     Get domain expiry date via WHOIS.
@@ -91,6 +57,54 @@ def _get_domain_expiry(domain: str) -> tuple[bool, str, datetime | None]:
         return False, f"WHOIS error: {error_msg[:40]}", None
 
 
+def _classify_expiry(domain: str, expiry: datetime, now: datetime,
+                     warn_days: int) -> tuple[str, str]:
+    """Classify a domain expiry date as ok, warn or err."""
+    days_left = (expiry - now).days
+
+    if days_left < 0:
+        return "err", f"{domain}: EXPIRED"
+    if days_left <= warn_days:
+        return "warn", f"{domain}: expires in {days_left} days"
+    return "ok", ""
+
+
+def _check_domain(domain: str, now: datetime, warn_days: int,
+                  cached_data: dict) -> tuple[str, str, dict]:
+    """
+    Check a single domain, using cached WHOIS data when available.
+
+    Returns:
+        Tuple of ('ok'|'warn'|'err', message, cache_entry)
+    """
+    # Check cache first
+    if domain in cached_data:
+        cache_entry = cached_data[domain]
+        if cache_entry.get("error"):
+            return "err", f"{domain}: {cache_entry['error']}", cache_entry
+
+        expiry_str = cache_entry.get("expiry")
+        if expiry_str:
+            try:
+                expiry = datetime.fromisoformat(expiry_str)
+                outcome, msg = _classify_expiry(domain, expiry, now, warn_days)
+                return outcome, msg, cache_entry
+            except ValueError:
+                pass
+
+    # Fetch fresh data
+    success, error_msg, expiry = _get_domain_expiry(domain)
+
+    if not success:
+        return "err", f"{domain}: {error_msg}", {"error": error_msg}
+
+    if expiry is None:
+        return "err", f"{domain}: Could not determine expiry", {"error": "No expiry date"}
+
+    outcome, msg = _classify_expiry(domain, expiry, now, warn_days)
+    return outcome, msg, {"expiry": expiry.isoformat()}
+
+
 def check_domains(domains: list[str], thresholds: dict, cache_config: dict) -> list[CheckResult]:
     """
     Check domain expiration for all configured domains.
@@ -123,67 +137,30 @@ def check_domains(domains: list[str], thresholds: dict, cache_config: dict) -> l
 
     cached_data = {}
     if use_cache:
-        cache_path = _get_cache_path(cache_dir)
-        cached_data = _load_cache(cache_path, cache_hours)
+        cached_data = cache.load(cache_dir, "domains", cache_hours, now.timestamp())
+
+    with ThreadPoolExecutor(max_workers=min(16, len(domains))) as executor:
+        checked = list(executor.map(
+            lambda d: _check_domain(d, now, warn_days, cached_data), domains
+        ))
 
     ok_count = 0
     warnings = []
     errors = []
     new_cache = {}
 
-    for domain in domains:
-        # Check cache first
-        if domain in cached_data:
-            cache_entry = cached_data[domain]
-            if cache_entry.get("error"):
-                errors.append(f"{domain}: {cache_entry['error']}")
-                new_cache[domain] = cache_entry
-                continue
-
-            expiry_str = cache_entry.get("expiry")
-            if expiry_str:
-                try:
-                    expiry = datetime.fromisoformat(expiry_str)
-                    days_left = (expiry - now).days
-
-                    if days_left < 0:
-                        errors.append(f"{domain}: EXPIRED")
-                    elif days_left <= warn_days:
-                        warnings.append(f"{domain}: expires in {days_left} days")
-                    else:
-                        ok_count += 1
-
-                    new_cache[domain] = cache_entry
-                    continue
-                except ValueError:
-                    pass
-
-        # Fetch fresh data
-        success, error_msg, expiry = _get_domain_expiry(domain)
-
-        if not success:
-            errors.append(f"{domain}: {error_msg}")
-            new_cache[domain] = {"error": error_msg}
-            continue
-
-        if expiry is None:
-            errors.append(f"{domain}: Could not determine expiry")
-            new_cache[domain] = {"error": "No expiry date"}
-            continue
-
-        days_left = (expiry - now).days
-        new_cache[domain] = {"expiry": expiry.isoformat()}
-
-        if days_left < 0:
-            errors.append(f"{domain}: EXPIRED")
-        elif days_left <= warn_days:
-            warnings.append(f"{domain}: expires in {days_left} days")
+    for domain, (outcome, msg, cache_entry) in zip(domains, checked):
+        new_cache[domain] = cache_entry
+        if outcome == "err":
+            errors.append(msg)
+        elif outcome == "warn":
+            warnings.append(msg)
         else:
             ok_count += 1
 
     # Save cache
     if use_cache:
-        _save_cache(cache_path, new_cache)
+        cache.save(cache_dir, "domains", new_cache)
 
     # Build results
     results = []
@@ -6,17 +6,41 @@ import requests
 from datetime import datetime, timezone
 from typing import Optional
 
+from requests.adapters import HTTPAdapter
+
+import cache
 from output import CheckResult, Status
+from timeutil import parse_iso
 
 
 GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+
+# Both searches in one request, costing a single rate-limit point
+SEARCH_QUERY = """
+query($prQuery: String!, $issueQuery: String!) {
+  prs: search(query: $prQuery, type: ISSUE, first: 20) {
+    nodes { ... on PullRequest { number title url createdAt repository { nameWithOwner } } }
+  }
+  issues: search(query: $issueQuery, type: ISSUE, first: 20) {
+    nodes { ... on Issue { number title url createdAt repository { nameWithOwner } } }
+  }
+}
+"""
+
+# Reuse keep-alive connections to api.github.com across requests
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 
-def _format_age(created_at: str) -> str:
+def _format_age(created_at: str, now: datetime) -> str:
     """Format how old a PR/issue is."""
     try:
-        created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        now = datetime.now(timezone.utc)
+        created = parse_iso(created_at)
         days = (now - created).days
 
         if days == 0:
@@ -29,13 +53,59 @@ def _format_age(created_at: str) -> str:
         return ""
 
 
-def check_github(token: Optional[str], config: dict) -> list[CheckResult]:
+def _search(headers: dict, pr_query: str, issue_query: str) -> dict:
+    """Run both GitHub searches as a single GraphQL request."""
+    response = _SESSION.post(
+        GITHUB_GRAPHQL_URL,
+        headers=headers,
+        json={
+            "query": SEARCH_QUERY,
+            "variables": {"prQuery": pr_query, "issueQuery": issue_query},
+        },
+        timeout=15
+    )
+    response.raise_for_status()
+
+    body = response.json()
+    if body.get("errors") and not body.get("data"):
+        raise requests.exceptions.RequestException(
+            body["errors"][0].get("message", "GraphQL query failed")
+        )
+    return body.get("data") or {}
+
+
+def _build_items(search: Optional[dict]) -> list[tuple]:
+    """
+    Convert GraphQL search nodes into item tuples.
+
+    Returns:
+        List of (number, title, repo, created_at, url) tuples
+    """
+    items = []
+    for node in (search or {}).get("nodes") or ():
+        if not node:
+            continue
+        get = node.get
+        repo = get("repository") or {}
+        items.append((
+            get("number"),
+            get("title", "Untitled"),
+            repo.get("nameWithOwner", "unknown"),
+            get("createdAt", ""),
+            get("url", ""),
+        ))
+    return items
+
+
+def check_github(token: Optional[str], config: dict,
+                 cache_config: dict) -> list[CheckResult]:
     """
     Check GitHub for PRs awaiting review and assigned issues.
 
     Args:
         token: GitHub personal access token
         config: GitHub config section
+        cache_config: Cache configuration
 
     Returns:
         List of CheckResult objects
@@ -56,56 +126,35 @@ def check_github(token: Optional[str], config: dict) -> list[CheckResult]:
         )]
 
     try:
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-
-        prs_to_review = []
-        assigned_issues = []
+        headers = {"Authorization": f"Bearer {token}"}
 
-        # Search for PRs where user is requested reviewer
+        # PRs where user is requested reviewer, and issues assigned to user
         pr_query = f"is:pr is:open review-requested:{username}"
-        response = requests.get(
-            f"{GITHUB_API_URL}/search/issues",
-            headers=headers,
-            params={"q": pr_query, "per_page": 20},
-            timeout=15
-        )
-        response.raise_for_status()
-
-        for item in response.json().get("items", []):
-            repo_url = item.get("repository_url", "")
-            repo_name = "/".join(repo_url.split("/")[-2:]) if repo_url else "unknown"
-            prs_to_review.append({
-                "number": item.get("number"),
-                "title": item.get("title", "Untitled"),
-                "repo": repo_name,
-                "created_at": item.get("created_at", ""),
-                "url": item.get("html_url", ""),
-            })
-
-        # Search for issues assigned to user
         issue_query = f"is:issue is:open assignee:{username}"
-        response = requests.get(
-            f"{GITHUB_API_URL}/search/issues",
-            headers=headers,
-            params={"q": issue_query, "per_page": 20},
-            timeout=15
-        )
-        response.raise_for_status()
-
-        for item in response.json().get("items", []):
-            repo_url = item.get("repository_url", "")
-            repo_name = "/".join(repo_url.split("/")[-2:]) if repo_url else "unknown"
-            assigned_issues.append({
-                "number": item.get("number"),
-                "title": item.get("title", "Untitled"),
-                "repo": repo_name,
-                "created_at": item.get("created_at", ""),
-                "url": item.get("html_url", ""),
-            })
+
+        # Handle caching
+        use_cache = cache_config.get("enabled", True)
+        cache_dir = cache_config.get("directory", "~/.cache/daily-hud")
+        cache_hours = cache_config.get("durations", {}).get("github", 10 / 60)
+
+        cached_data = {}
+        if use_cache:
+            cached_data = cache.load(cache_dir, "github_search", cache_hours)
+
+        if cached_data.get("username") == username:
+            prs_to_review = cached_data.get("prs", [])
+            assigned_issues = cached_data.get("issues", [])
+        else:
+            data = _search(headers, pr_query, issue_query)
+            prs_to_review = _build_items(data.get("prs"))
+            assigned_issues = _build_items(data.get("issues"))
+
+            if use_cache:
+                cache.save(cache_dir, "github_search", {
+                    "username": username,
+                    "prs": prs_to_review,
+                    "issues": assigned_issues,
+                })
 
         # Build result
         pr_count = len(prs_to_review)
@@ -134,14 +183,15 @@ def check_github(token: Optional[str], config: dict) -> list[CheckResult]:
         )
 
         # Add PR details
-        for pr in prs_to_review:
-            age = _format_age(pr["created_at"])
+        now = datetime.now(timezone.utc)
+        for number, title, repo, created_at, _ in prs_to_review:
+            age = _format_age(created_at, now)
             age_str = f" - {age}" if age else ""
-            result.add_detail(f"PR #{pr['number']}: {pr['title']} ({pr['repo']}){age_str}")
+            result.add_detail(f"PR #{number}: {title} ({repo}){age_str}")
 
         # Add issue details
-        for issue in assigned_issues:
-            result.add_detail(f"Issue #{issue['number']}: {issue['title']} ({issue['repo']})")
+        for number, title, repo, _, _ in assigned_issues:
+            result.add_detail(f"Issue #{number}: {title} ({repo})")
 
         return [result]
 
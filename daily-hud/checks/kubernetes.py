@@ -2,17 +2,82 @@
 Kubernetes health checks via kubectl.
 """
 
+import heapq
 import json
+import re
 import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Optional
 
+import cache
 from output import CheckResult, Status
+from timeutil import parse_iso
+
+# Prefer orjson for large kubectl payloads, falling back to stdlib json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Server-side projections for checks that only need a few fields, emitted
+# as tab-separated lines instead of full object JSON
+NODES_JSONPATH = (
+    r'{range .items[*]}{.metadata.name}{"\t"}'
+    r'{.status.conditions[?(@.type=="Ready")].status}{"\n"}{end}'
+)
+SNAPSHOTS_JSONPATH = (
+    r'{range .items[*]}{.metadata.namespace}{"\t"}{.metadata.name}{"\t"}'
+    r'{.status.creationTime}{"\n"}{end}'
+)
+# The backup spec goes last; the check only needs to know it is non-empty
+CNPG_JSONPATH = (
+    r'{range .items[*]}{.metadata.namespace}{"\t"}{.metadata.name}{"\t"}'
+    r'{.status.phase}{"\t"}{.status.firstRecoverabilityPoint}{"\t"}'
+    r'{.status.lastSuccessfulBackup}{"\t"}{.spec.backup}{"\n"}{end}'
+)
+
+# Kubernetes quantities, normalized to MiB and millicores
+_MEM_RE = re.compile(r"^(\d+(?:\.\d+)?)([KMGT]i)$")
+_MEM_MULT = {"Ki": 1 / 1024, "Mi": 1, "Gi": 1024, "Ti": 1024 * 1024}
+_CPU_RE = re.compile(r"^(\d+(?:\.\d+)?)(m?)$")
+
+# Maximum problems listed as details per check
+MAX_POD_PROBLEMS = 10
+MAX_PRESSURE_WARNINGS = 5
+MAX_STALE_SNAPSHOTS = 5
+
+# Container waiting reasons that mark a pod as unhealthy
+_BAD_WAITING_REASONS = frozenset(("CrashLoopBackOff", "ImagePullBackOff", "ErrImagePull"))
+
+
+def _parse_mem_mi(value: str) -> int:
+    """Parse a memory quantity like 512Mi or 2Gi into MiB (0 if unknown)."""
+    m = _MEM_RE.match(value)
+    if not m:
+        return 0
+    return int(float(m.group(1)) * _MEM_MULT[m.group(2)])
+
+
+def _parse_cpu_m(value: str) -> int:
+    """Parse a CPU quantity like 250m or 1.5 into millicores (0 if unknown)."""
+    m = _CPU_RE.match(value)
+    if not m:
+        return 0
+    if m.group(2):
+        return int(float(m.group(1)))
+    return int(float(m.group(1)) * 1000)
 
 
 def _run_kubectl(args: list[str], context: Optional[str] = None,
-                 timeout: int = 30) -> tuple[bool, str]:
-    """Run a kubectl command and return success status and output."""
+                 timeout: int = 30, text: bool = True) -> tuple[bool, str | bytes]:
+    """
+    Run a kubectl command and return success status and output.
+
+    With text=False, successful output is returned as raw bytes so JSON
+    can be parsed without an intermediate decode. Errors are always str.
+    """
     cmd = ["kubectl"]
     if context:
         cmd.extend(["--context", context])
@@ -22,11 +87,13 @@ def _run_kubectl(args: list[str], context: Optional[str] = None,
         result = subprocess.run(
             cmd,
             capture_output=True,
-            text=True,
             timeout=timeout
         )
         if result.returncode != 0:
-            return False, result.stderr.strip() or "Unknown error"
+            stderr = result.stderr.decode(errors="replace").strip()
+            return False, stderr or "Unknown error"
+        if text:
+            return True, result.stdout.decode(errors="replace")
         return True, result.stdout
     except subprocess.TimeoutExpired:
         return False, "Command timed out"
@@ -34,10 +101,80 @@ def _run_kubectl(args: list[str], context: Optional[str] = None,
         return False, "kubectl not found in PATH"
 
 
+def _trim_pods(data: dict) -> dict:
+    """Reduce a pod list to the fields the pod and resource checks read."""
+    items = []
+    for pod in data.get("items", []):
+        metadata = pod.get("metadata", {})
+        status = pod.get("status", {})
+        items.append({
+            "metadata": {
+                "namespace": metadata.get("namespace", ""),
+                "name": metadata.get("name", "unknown"),
+            },
+            "status": {
+                "phase": status.get("phase", "Unknown"),
+                "containerStatuses": [
+                    {
+                        "restartCount": cs.get("restartCount", 0),
+                        "state": {"waiting": cs.get("state", {}).get("waiting", {})},
+                    }
+                    for cs in status.get("containerStatuses", [])
+                ],
+            },
+            "spec": {
+                "containers": [
+                    {"resources": {"limits": c.get("resources", {}).get("limits", {})}}
+                    for c in pod.get("spec", {}).get("containers", [])
+                ],
+            },
+        })
+    return {"items": items}
+
+
+def _get_pods(context: Optional[str],
+              cache_config: dict) -> tuple[Optional[dict], str]:
+    """
+    Fetch and parse all pods once, for sharing between checks.
+
+    The trimmed pod list is cached briefly, so back-to-back runs do not
+    re-fetch a potentially multi-MB listing from the apiserver.
+
+    Returns:
+        Tuple of (parsed pod list or None, error message)
+    """
+    use_cache = cache_config.get("enabled", True)
+    cache_dir = cache_config.get("directory", "~/.cache/daily-hud")
+    cache_hours = cache_config.get("durations", {}).get("kubernetes", 1 / 60)
+
+    if use_cache:
+        cached_data = cache.load(cache_dir, "kubernetes_pods", cache_hours)
+        if cached_data and cached_data.get("context") == context:
+            return cached_data["pods"], ""
+
+    success, output = _run_kubectl(
+        ["get", "pods", "-A", "-o", "json"],
+        context=context,
+        text=False
+    )
+    if not success:
+        return None, output
+
+    try:
+        pods = _trim_pods(_loads(output))
+    except json.JSONDecodeError:
+        return None, "Failed to parse kubectl output"
+
+    if use_cache:
+        cache.save(cache_dir, "kubernetes_pods", {"context": context, "pods": pods})
+
+    return pods, ""
+
+
 def _check_nodes(context: Optional[str]) -> CheckResult:
     """Check node health."""
     success, output = _run_kubectl(
-        ["get", "nodes", "-o", "json"],
+        ["get", "nodes", "-o", f"jsonpath={NODES_JSONPATH}"],
         context=context
     )
 
@@ -48,156 +185,132 @@ def _check_nodes(context: Optional[str]) -> CheckResult:
             message=f"Nodes: {output}"
         )
 
-    try:
-        data = json.loads(output)
-        nodes = data.get("items", [])
-
-        healthy = 0
-        unhealthy = []
-
-        for node in nodes:
-            name = node.get("metadata", {}).get("name", "unknown")
-            conditions = node.get("status", {}).get("conditions", [])
-
-            # Check for Ready condition
-            ready = False
-            for cond in conditions:
-                if cond.get("type") == "Ready":
-                    ready = cond.get("status") == "True"
-                    break
+    healthy = 0
+    unhealthy = []
 
-            if ready:
-                healthy += 1
-            else:
-                unhealthy.append(name)
-
-        total = len(nodes)
+    for line in output.splitlines():
+        if not line:
+            continue
+        name, _, ready = line.partition("\t")
 
-        if not unhealthy:
-            return CheckResult(
-                name="k8s-nodes",
-                status=Status.OK,
-                message=f"Nodes: {healthy}/{total} healthy"
-            )
+        if ready == "True":
+            healthy += 1
         else:
-            result = CheckResult(
-                name="k8s-nodes",
-                status=Status.ERROR,
-                message=f"Nodes: {healthy}/{total} healthy"
-            )
-            for node in unhealthy:
-                result.add_detail(f"Not Ready: {node}")
-            return result
+            unhealthy.append(name or "unknown")
 
-    except json.JSONDecodeError:
+    total = healthy + len(unhealthy)
+
+    if not unhealthy:
         return CheckResult(
+            name="k8s-nodes",
+            status=Status.OK,
+            message=f"Nodes: {healthy}/{total} healthy"
+        )
+    else:
+        result = CheckResult(
             name="k8s-nodes",
             status=Status.ERROR,
-            message="Nodes: Failed to parse kubectl output"
+            message=f"Nodes: {healthy}/{total} healthy"
         )
+        for node in unhealthy:
+            result.add_detail(f"Not Ready: {node}")
+        return result
 
 
-def _check_pods(context: Optional[str], config: dict) -> CheckResult:
+def _check_pods(pods_future: Future, config: dict) -> CheckResult:
     """Check pod health."""
-    ignore_ns = config.get("ignore_namespaces", [])
-    target_ns = config.get("namespaces", [])
+    ignore_ns = frozenset(config.get("ignore_namespaces") or ())
+    target_ns = frozenset(config.get("namespaces") or ())
 
-    success, output = _run_kubectl(
-        ["get", "pods", "-A", "-o", "json"],
-        context=context
-    )
+    data, error = pods_future.result()
 
-    if not success:
+    if data is None:
         return CheckResult(
             name="k8s-pods",
             status=Status.ERROR,
-            message=f"Pods: {output}"
+            message=f"Pods: {error}"
         )
 
-    try:
-        data = json.loads(output)
-        pods = data.get("items", [])
-
-        running = 0
-        problems = []
-
-        for pod in pods:
-            ns = pod.get("metadata", {}).get("namespace", "")
-            name = pod.get("metadata", {}).get("name", "unknown")
+    pods = data.get("items", [])
 
-            # Filter namespaces
-            if ignore_ns and ns in ignore_ns:
-                continue
-            if target_ns and ns not in target_ns:
-                continue
+    running = 0
+    problem_count = 0
+    problems = []
 
-            phase = pod.get("status", {}).get("phase", "Unknown")
-            container_statuses = pod.get("status", {}).get("containerStatuses", [])
+    for pod in pods:
+        ns = pod.get("metadata", {}).get("namespace", "")
+        name = pod.get("metadata", {}).get("name", "unknown")
 
-            # Check for problems
-            is_ok = phase in ("Running", "Succeeded")
+        # Filter namespaces
+        if ignore_ns and ns in ignore_ns:
+            continue
+        if target_ns and ns not in target_ns:
+            continue
 
-            # Check for restart loops
-            restart_count = 0
-            waiting_reason = None
-            for cs in container_statuses:
-                restart_count += cs.get("restartCount", 0)
-                waiting = cs.get("state", {}).get("waiting", {})
-                if waiting:
-                    waiting_reason = waiting.get("reason", "")
+        phase = pod.get("status", {}).get("phase", "Unknown")
+        container_statuses = pod.get("status", {}).get("containerStatuses", [])
 
-            if restart_count > 10:
-                is_ok = False
-            if waiting_reason in ("CrashLoopBackOff", "ImagePullBackOff", "ErrImagePull"):
-                is_ok = False
+        # Check for problems
+        is_ok = phase in ("Running", "Succeeded")
 
-            if is_ok:
-                running += 1
-            else:
-                reason = waiting_reason or phase
-                if restart_count > 10:
-                    reason = f"{reason} ({restart_count} restarts)"
-                problems.append({
-                    "ns": ns,
-                    "name": name,
-                    "reason": reason,
-                })
+        # Check for restart loops
+        restart_count = 0
+        waiting_reason = None
+        for cs in container_statuses:
+            restart_count += cs.get("restartCount", 0)
+            waiting = cs.get("state", {}).get("waiting", {})
+            if waiting:
+                waiting_reason = waiting.get("reason", "")
 
-        total = running + len(problems)
+        if restart_count > 10:
+            is_ok = False
+        if waiting_reason in _BAD_WAITING_REASONS:
+            is_ok = False
 
-        if not problems:
-            return CheckResult(
-                name="k8s-pods",
-                status=Status.OK,
-                message=f"Pods: {running}/{total} running"
-            )
+        if is_ok:
+            running += 1
         else:
-            result = CheckResult(
-                name="k8s-pods",
-                status=Status.ERROR,
-                message=f"Pods: {running}/{total} running"
-            )
-            for pod in problems[:10]:  # Limit to 10
-                result.add_detail(f"{pod['ns']}/{pod['name']}: {pod['reason']}")
-            if len(problems) > 10:
-                result.add_detail(f"... and {len(problems) - 10} more")
-            return result
+            problem_count += 1
+            if len(problems) >= MAX_POD_PROBLEMS:
+                continue
+            reason = waiting_reason or phase
+            if restart_count > 10:
+                reason = f"{reason} ({restart_count} restarts)"
+            problems.append({
+                "ns": ns,
+                "name": name,
+                "reason": reason,
+            })
 
-    except json.JSONDecodeError:
+    total = running + problem_count
+
+    if not problems:
         return CheckResult(
+            name="k8s-pods",
+            status=Status.OK,
+            message=f"Pods: {running}/{total} running"
+        )
+    else:
+        result = CheckResult(
             name="k8s-pods",
             status=Status.ERROR,
-            message="Pods: Failed to parse kubectl output"
+            message=f"Pods: {running}/{total} running"
         )
+        for pod in problems:
+            result.add_detail(f"{pod['ns']}/{pod['name']}: {pod['reason']}")
+        if problem_count > len(problems):
+            result.add_detail(f"... and {problem_count - len(problems)} more")
+        return result
 
 
-def _check_snapshots(context: Optional[str], config: dict) -> CheckResult:
+def _check_snapshots(context: Optional[str], config: dict,
+                     now: datetime) -> CheckResult:
     """Check for stale volume snapshots."""
     stale_hours = config.get("snapshot_stale_hours", 24)
-    ignore_ns = config.get("ignore_namespaces", [])
+    ignore_ns = frozenset(config.get("ignore_namespaces") or ())
 
     success, output = _run_kubectl(
-        ["get", "volumesnapshots", "-A", "-o", "json"],
+        ["get", "volumesnapshots", "-A", "-o", f"jsonpath={SNAPSHOTS_JSONPATH}"],
         context=context
     )
 
@@ -214,68 +327,58 @@ def _check_snapshots(context: Optional[str], config: dict) -> CheckResult:
             message=f"Snapshots: {output}"
         )
 
-    try:
-        data = json.loads(output)
-        snapshots = data.get("items", [])
+    stale = []
 
-        now = datetime.now(timezone.utc)
-        stale = []
+    for line in output.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 3:
+            continue
+        ns, name, creation_time = parts
 
-        for snap in snapshots:
-            ns = snap.get("metadata", {}).get("namespace", "")
-            name = snap.get("metadata", {}).get("name", "unknown")
+        if ignore_ns and ns in ignore_ns:
+            continue
 
-            if ignore_ns and ns in ignore_ns:
-                continue
+        # Check creation time from status
+        if not creation_time:
+            continue
 
-            # Check creation time from status
-            creation_time = snap.get("status", {}).get("creationTime")
-            if not creation_time:
-                continue
+        try:
+            created = parse_iso(creation_time)
+            age_hours = (now - created).total_seconds() / 3600
 
-            try:
-                created = datetime.fromisoformat(creation_time.replace("Z", "+00:00"))
-                age_hours = (now - created).total_seconds() / 3600
-
-                if age_hours > stale_hours:
-                    stale.append({
-                        "ns": ns,
-                        "name": name,
-                        "age_hours": int(age_hours),
-                    })
-            except (ValueError, TypeError):
-                continue
-
-        if not stale:
-            return CheckResult(
-                name="k8s-snapshots",
-                status=Status.OK,
-                message=f"Snapshots: All within {stale_hours}h"
-            )
-        else:
-            result = CheckResult(
-                name="k8s-snapshots",
-                status=Status.WARNING,
-                message=f"Snapshots: {len(stale)} stale (>{stale_hours}h)"
-            )
-            for snap in sorted(stale, key=lambda s: s["age_hours"], reverse=True)[:5]:
-                result.add_detail(f"{snap['ns']}/{snap['name']}: {snap['age_hours']}h old")
-            return result
+            if age_hours > stale_hours:
+                stale.append({
+                    "ns": ns,
+                    "name": name or "unknown",
+                    "age_hours": int(age_hours),
+                })
+        except (ValueError, TypeError):
+            continue
 
-    except json.JSONDecodeError:
+    if not stale:
         return CheckResult(
             name="k8s-snapshots",
-            status=Status.ERROR,
-            message="Snapshots: Failed to parse kubectl output"
+            status=Status.OK,
+            message=f"Snapshots: All within {stale_hours}h"
+        )
+    else:
+        result = CheckResult(
+            name="k8s-snapshots",
+            status=Status.WARNING,
+            message=f"Snapshots: {len(stale)} stale (>{stale_hours}h)"
         )
+        oldest = heapq.nlargest(MAX_STALE_SNAPSHOTS, stale, key=lambda s: s["age_hours"])
+        for snap in oldest:
+            result.add_detail(f"{snap['ns']}/{snap['name']}: {snap['age_hours']}h old")
+        return result
 
 
 def _check_cnpg(context: Optional[str], config: dict) -> CheckResult:
     """Check CNPG (CloudNativePG) cluster backup status."""
-    ignore_ns = config.get("ignore_namespaces", [])
+    ignore_ns = frozenset(config.get("ignore_namespaces") or ())
 
     success, output = _run_kubectl(
-        ["get", "clusters.postgresql.cnpg.io", "-A", "-o", "json"],
+        ["get", "clusters.postgresql.cnpg.io", "-A", "-o", f"jsonpath={CNPG_JSONPATH}"],
         context=context
     )
 
@@ -292,81 +395,65 @@ def _check_cnpg(context: Optional[str], config: dict) -> CheckResult:
             message=f"CNPG: {output}"
         )
 
-    try:
-        data = json.loads(output)
-        clusters = data.get("items", [])
-
-        if not clusters:
-            return CheckResult(
-                name="k8s-cnpg",
-                status=Status.OK,
-                message="CNPG: No clusters found"
-            )
-
-        problems = []
-
-        for cluster in clusters:
-            ns = cluster.get("metadata", {}).get("namespace", "")
-            name = cluster.get("metadata", {}).get("name", "unknown")
-
-            if ignore_ns and ns in ignore_ns:
-                continue
+    clusters = [
+        parts for parts in (line.split("\t", 5) for line in output.splitlines())
+        if len(parts) == 6
+    ]
 
-            status = cluster.get("status", {})
-
-            # Check overall health
-            phase = status.get("phase", "Unknown")
-            if phase != "Cluster in healthy state":
-                problems.append({
-                    "ns": ns,
-                    "name": name,
-                    "issue": f"Phase: {phase}",
-                })
-                continue
-
-            # Check backup status
-            first_recov_point = status.get("firstRecoverabilityPoint")
-            last_successful_backup = status.get("lastSuccessfulBackup")
-
-            if not first_recov_point and not last_successful_backup:
-                # Check if backups are configured
-                backup_config = cluster.get("spec", {}).get("backup")
-                if backup_config:
-                    problems.append({
-                        "ns": ns,
-                        "name": name,
-                        "issue": "No successful backups",
-                    })
-
-        if not problems:
-            return CheckResult(
-                name="k8s-cnpg",
-                status=Status.OK,
-                message=f"CNPG Backups: {len(clusters)} cluster(s) OK"
-            )
-        else:
-            result = CheckResult(
-                name="k8s-cnpg",
-                status=Status.WARNING,
-                message=f"CNPG: {len(problems)} issue(s)"
-            )
-            for p in problems:
-                result.add_detail(f"{p['ns']}/{p['name']}: {p['issue']}")
-            return result
+    if not clusters:
+        return CheckResult(
+            name="k8s-cnpg",
+            status=Status.OK,
+            message="CNPG: No clusters found"
+        )
 
-    except json.JSONDecodeError:
+    problems = []
+
+    for ns, name, phase, first_recov_point, last_successful_backup, backup_config in clusters:
+        if ignore_ns and ns in ignore_ns:
+            continue
+
+        # Check overall health
+        phase = phase or "Unknown"
+        if phase != "Cluster in healthy state":
+            problems.append({
+                "ns": ns,
+                "name": name,
+                "issue": f"Phase: {phase}",
+            })
+            continue
+
+        # Check backup status, if backups are configured
+        if not first_recov_point and not last_successful_backup and backup_config:
+            problems.append({
+                "ns": ns,
+                "name": name,
+                "issue": "No successful backups",
+            })
+
+    if not problems:
         return CheckResult(
             name="k8s-cnpg",
-            status=Status.ERROR,
-            message="CNPG: Failed to parse kubectl output"
+            status=Status.OK,
+            message=f"CNPG Backups: {len(clusters)} cluster(s) OK"
         )
 
+    result = CheckResult(
+        name="k8s-cnpg",
+        status=Status.WARNING,
+        message=f"CNPG: {len(problems)} issue(s)"
+    )
+    for p in problems:
+        result.add_detail(f"{p['ns']}/{p['name']}: {p['issue']}")
+    return result
+
 
-def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResult:
+def _check_resource_pressure(context: Optional[str], config: dict,
+                             pods_future: Future) -> CheckResult:
     """Check pods approaching resource limits."""
     mem_warn = config.get("pod_memory_warning_percent", 80)
     cpu_warn = config.get("pod_cpu_warning_percent", 80)
-    ignore_ns = config.get("ignore_namespaces", [])
+    ignore_ns = frozenset(config.get("ignore_namespaces") or ())
 
     # Get pod resource usage
     success, output = _run_kubectl(
@@ -387,13 +474,10 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
             message=f"Resources: {output}"
         )
 
-    # Get pod specs for limits
-    success2, specs_output = _run_kubectl(
-        ["get", "pods", "-A", "-o", "json"],
-        context=context
-    )
+    # Pod specs for limits, shared with the pod health check
+    specs_data, _ = pods_future.result()
 
-    if not success2:
+    if specs_data is None:
         return CheckResult(
             name="k8s-resources",
             status=Status.ERROR,
@@ -401,7 +485,6 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
         )
 
     try:
-        specs_data = json.loads(specs_output)
         pod_limits = {}
 
         for pod in specs_data.get("items", []):
@@ -416,23 +499,13 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
             for container in containers:
                 limits = container.get("resources", {}).get("limits", {})
 
-                # Parse memory limit
-                mem_str = limits.get("memory", "")
+                mem_str = limits.get("memory")
                 if mem_str:
-                    if mem_str.endswith("Gi"):
-                        total_mem_limit += int(float(mem_str[:-2]) * 1024)
-                    elif mem_str.endswith("Mi"):
-                        total_mem_limit += int(float(mem_str[:-2]))
-                    elif mem_str.endswith("Ki"):
-                        total_mem_limit += int(float(mem_str[:-2]) / 1024)
-
-                # Parse CPU limit
-                cpu_str = limits.get("cpu", "")
+                    total_mem_limit += _parse_mem_mi(mem_str)
+
+                cpu_str = limits.get("cpu")
                 if cpu_str:
-                    if cpu_str.endswith("m"):
-                        total_cpu_limit += int(cpu_str[:-1])
-                    else:
-                        total_cpu_limit += int(float(cpu_str) * 1000)
+                    total_cpu_limit += _parse_cpu_m(cpu_str)
 
             if total_mem_limit > 0 or total_cpu_limit > 0:
                 pod_limits[key] = {
@@ -441,6 +514,7 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
                 }
 
         # Parse top output and check against limits
+        warning_count = 0
         warnings = []
 
         for line in output.strip().split("\n"):
@@ -462,15 +536,8 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
             limits = pod_limits[key]
 
             # Parse current usage
-            current_cpu = 0
-            if cpu_str.endswith("m"):
-                current_cpu = int(cpu_str[:-1])
-
-            current_mem = 0
-            if mem_str.endswith("Mi"):
-                current_mem = int(mem_str[:-2])
-            elif mem_str.endswith("Gi"):
-                current_mem = int(float(mem_str[:-2]) * 1024)
+            current_cpu = _parse_cpu_m(cpu_str)
+            current_mem = _parse_mem_mi(mem_str)
 
             # Check percentages
             mem_pct = 0
@@ -482,9 +549,15 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
                 cpu_pct = (current_cpu / limits["cpu_limit_m"]) * 100
 
             if mem_pct >= mem_warn:
-                warnings.append(f"{key}: {int(mem_pct)}% memory limit")
+                warning = f"{key}: {int(mem_pct)}% memory limit"
             elif cpu_pct >= cpu_warn:
-                warnings.append(f"{key}: {int(cpu_pct)}% CPU limit")
+                warning = f"{key}: {int(cpu_pct)}% CPU limit"
+            else:
+                continue
+
+            warning_count += 1
+            if len(warnings) < MAX_PRESSURE_WARNINGS:
+                warnings.append(warning)
 
         if not warnings:
             return CheckResult(
@@ -496,15 +569,15 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
             result = CheckResult(
                 name="k8s-resources",
                 status=Status.WARNING,
-                message=f"Resources: {len(warnings)} pod(s) under pressure"
+                message=f"Resources: {warning_count} pod(s) under pressure"
             )
-            for w in warnings[:5]:
+            for w in warnings:
                 result.add_detail(w)
-            if len(warnings) > 5:
-                result.add_detail(f"... and {len(warnings) - 5} more")
+            if warning_count > len(warnings):
+                result.add_detail(f"... and {warning_count - len(warnings)} more")
             return result
 
-    except (json.JSONDecodeError, ValueError):
+    except ValueError:
         return CheckResult(
             name="k8s-resources",
             status=Status.ERROR,
@@ -512,12 +585,13 @@ def _check_resource_pressure(context: Optional[str], config: dict) -> CheckResul
         )
 
 
-def check_kubernetes(config: dict) -> list[CheckResult]:
+def check_kubernetes(config: dict, cache_config: dict) -> list[CheckResult]:
     """
     Run all Kubernetes health checks.
 
     Args:
         config: Kubernetes config section
+        cache_config: Cache configuration
 
     Returns:
         List of CheckResult objects
@@ -527,14 +601,19 @@ def check_kubernetes(config: dict) -> list[CheckResult]:
 
     # Merge thresholds into config for individual checks
     check_config = {**config, **thresholds}
-
-    results = []
-
-    # Run all checks
-    results.append(_check_nodes(context))
-    results.append(_check_pods(context, check_config))
-    results.append(_check_snapshots(context, check_config))
-    results.append(_check_cnpg(context, check_config))
-    results.append(_check_resource_pressure(context, check_config))
+    now = datetime.now(timezone.utc)
+
+    # Run all checks concurrently; each waits on its own kubectl call, and
+    # the pod list is fetched once for both checks that need it
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        pods_future = executor.submit(_get_pods, context, cache_config)
+        futures = [
+            executor.submit(_check_nodes, context),
+            executor.submit(_check_pods, pods_future, check_config),
+            executor.submit(_check_snapshots, context, check_config, now),
+            executor.submit(_check_cnpg, context, check_config),
+            executor.submit(_check_resource_pressure, context, check_config, pods_future),
+        ]
+        results = [future.result() for future in futures]
 
     return results
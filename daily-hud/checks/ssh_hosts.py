@@ -1,21 +1,147 @@
 """
 SSH-based host checks for disk usage and package updates.
+
+Connections are multiplexed with OpenSSH ControlMaster, so a run within a
+few minutes of the previous one reuses its sessions instead of repeating
+the handshake. Sessions can be pre-warmed with e.g. `ssh -Nf host` using
+the same ControlPath; otherwise the first run starts a master itself.
 """
 
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
 from output import CheckResult, Status
 
 
+# Control sockets are named by connection hash (%C) to stay well within
+# the UNIX socket path length limit
+CONTROL_DIR = Path("~/.ssh/daily-hud").expanduser()
+CONTROL_PERSIST = "300s"
+
+# Serializes master startup per destination within a run
+_master_locks: dict[str, threading.Lock] = {}
+_master_locks_guard = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _control_dir() -> Optional[Path]:
+    """Create the control socket directory on first use, or None if it can't be."""
+    try:
+        CONTROL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        return CONTROL_DIR
+    except OSError:
+        return None
+
+
+def shared_connection(ssh_options: list[str], destination: str,
+                      timeout: int = 30) -> tuple[Optional[str], list[str]]:
+    """
+    Make sure a ControlMaster connection to destination is running.
+
+    If no live master answers, one is started on its own with -f -N and no
+    inherited pipes, so a persisting master never holds a caller's captured
+    output open.
+    Commands then join it with ControlMaster=no.
+
+    Args:
+        ssh_options: Options the master should connect with
+        destination: user@host to connect to
+        timeout: Seconds to wait for the master to connect
+
+    Returns:
+        Tuple of (error, control_options) where error is the ssh error if
+        the master could not connect, and control_options are the options
+        that reuse it (empty if multiplexing is unavailable)
+    """
+    control_dir = _control_dir()
+    if control_dir is None:
+        return None, []
+
+    control_options = ["-o", f"ControlPath={control_dir}/%C"]
+    with _master_locks_guard:
+        lock = _master_locks.setdefault(destination, threading.Lock())
+
+    with lock:
+        try:
+            check = subprocess.run(
+                ["ssh", *control_options, "-O", "check", destination],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout
+            )
+            if check.returncode != 0:
+                # ControlMaster=auto (not yes) so ssh unlinks a stale socket
+                # left by a killed master instead of failing to bind and
+                # lingering as a plain connection. Errors go to a file
+                # rather than a pipe, since the backgrounded master keeps
+                # its stderr open until it exits.
+                with tempfile.TemporaryFile() as stderr:
+                    master = subprocess.run(
+                        [
+                            "ssh", *ssh_options, *control_options,
+                            "-o", "ControlMaster=auto",
+                            "-o", f"ControlPersist={CONTROL_PERSIST}",
+                            "-f", "-N", destination,
+                        ],
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.DEVNULL,
+                        stderr=stderr,
+                        timeout=timeout
+                    )
+                    if master.returncode != 0:
+                        stderr.seek(0)
+                        error = stderr.read().decode("utf-8", "replace").strip()
+                        return error or "Connection failed", []
+        except subprocess.TimeoutExpired:
+            return "Connection timed out", []
+        except FileNotFoundError:
+            return "ssh not found in PATH", []
+
+    return None, ["-o", "ControlMaster=no", *control_options]
+
+
+# Each check's remote command, run together in one SSH session. Output of
+# each section follows its marker line.
+PROBE_MARKER = "__PROBE_OK__"
+SECTION_COMMANDS = {
+    "disk": (
+        "df -h --output=target,pcent,avail"
+        " -x tmpfs -x devtmpfs -x proc -x sysfs -x overlay -x squashfs"
+    ),
+    "updates": (
+        "if command -v apt >/dev/null 2>&1; then"
+        " echo apt; apt list --upgradable 2>/dev/null;"
+        " elif command -v dnf >/dev/null 2>&1; then"
+        " echo dnf; dnf check-update -q 2>/dev/null;"
+        " elif command -v yum >/dev/null 2>&1; then"
+        " echo yum; yum check-update -q 2>/dev/null;"
+        " fi"
+    ),
+}
+
+
 def _run_ssh(host: str, user: str, command: str,
              timeout: int = 30) -> tuple[bool, str]:
     """Run a command via SSH and return success status and output."""
-    ssh_cmd = [
-        "ssh",
+    ssh_options = [
         "-o", "BatchMode=yes",
         "-o", "ConnectTimeout=10",
         "-o", "StrictHostKeyChecking=accept-new",
+    ]
+    error, control_options = shared_connection(ssh_options, f"{user}@{host}")
+    if error is not None:
+        return False, error
+
+    ssh_cmd = [
+        "ssh",
+        *ssh_options,
+        *control_options,
         f"{user}@{host}",
         command
     ]
@@ -37,18 +163,55 @@ def _run_ssh(host: str, user: str, command: str,
         return False, "ssh not found in PATH"
 
 
-def _check_disk(host: str, user: str, thresholds: dict) -> Optional[CheckResult]:
-    """Check disk usage on remote host."""
-    warn_pct = thresholds.get("disk_warning_percent", 80)
-    crit_pct = thresholds.get("disk_critical_percent", 90)
+def _marker(section: str) -> str:
+    """Get the output marker line for a section."""
+    return f"__{section.upper()}__"
 
-    success, output = _run_ssh(
-        host, user,
-        "df -h --output=target,pcent,avail | grep -E '^/' | grep -v '/dev|/run|/sys|/proc'"
-    )
 
+def _run_sections(host: str, user: str,
+                  sections: list[str]) -> Optional[dict[str, str]]:
+    """
+    Run the probe and all requested sections in a single SSH invocation.
+
+    Returns:
+        Dict mapping section name to its output, or None if the host
+        could not be reached
+    """
+    script = [f"echo {PROBE_MARKER}"]
+    for section in sections:
+        script.append(f"echo {_marker(section)}")
+        script.append(SECTION_COMMANDS[section])
+    # A failing pipeline in the last section must not look like a failed login
+    script.append("exit 0")
+
+    success, output = _run_ssh(host, user, "\n".join(script))
     if not success:
-        return None  # Will be reported as connection error
+        return None
+
+    markers = {_marker(section): section for section in sections}
+    outputs = {}
+    current = None
+    probed = False
+
+    for line in output.split("\n"):
+        if line == PROBE_MARKER:
+            probed = True
+        elif line in markers:
+            current = markers[line]
+            outputs[current] = []
+        elif current:
+            outputs[current].append(line)
+
+    if not probed:
+        return None
+
+    return {section: "\n".join(lines) for section, lines in outputs.items()}
+
+
+def _check_disk(output: str, thresholds: dict) -> CheckResult:
+    """Check disk usage from remote df output."""
+    warn_pct = thresholds.get("disk_warning_percent", 80)
+    crit_pct = thresholds.get("disk_critical_percent", 90)
 
     warnings = []
     errors = []
@@ -61,6 +224,8 @@ def _check_disk(host: str, user: str, thresholds: dict) -> Optional[CheckResult]
             continue
 
         mount = parts[0]
+        if not mount.startswith("/"):
+            continue
         pct_str = parts[1].rstrip("%")
         avail = parts[2]
 
@@ -100,79 +265,28 @@ def _check_disk(host: str, user: str, thresholds: dict) -> Optional[CheckResult]
         )
 
 
-def _check_updates(host: str, user: str) -> Optional[CheckResult]:
-    """Check for pending package updates on remote host."""
-    # Try apt first (Debian/Ubuntu)
-    success, output = _run_ssh(
-        host, user,
-        "apt list --upgradable 2>/dev/null | grep -v '^Listing' | wc -l"
-    )
-
-    if success:
-        try:
-            count = int(output.strip())
-            if count > 0:
-                return CheckResult(
-                    name="updates",
-                    status=Status.WARNING,
-                    message=f"Updates: {count} pending (apt)"
-                )
-            else:
-                return CheckResult(
-                    name="updates",
-                    status=Status.OK,
-                    message="Updates: Up to date"
-                )
-        except ValueError:
-            pass
-
-    # Try dnf (RHEL/Fedora)
-    success, output = _run_ssh(
-        host, user,
-        "dnf check-update -q 2>/dev/null | wc -l"
-    )
+def _check_updates(output: str) -> CheckResult:
+    """Check for pending package updates from remote package manager output."""
+    manager, _, listing = output.partition("\n")
 
-    if success:
-        try:
-            count = int(output.strip())
-            if count > 0:
-                return CheckResult(
-                    name="updates",
-                    status=Status.WARNING,
-                    message=f"Updates: {count} pending (dnf)"
-                )
-            else:
-                return CheckResult(
-                    name="updates",
-                    status=Status.OK,
-                    message="Updates: Up to date"
-                )
-        except ValueError:
-            pass
-
-    # Try yum (older RHEL/CentOS)
-    success, output = _run_ssh(
-        host, user,
-        "yum check-update -q 2>/dev/null | wc -l"
-    )
-
-    if success:
-        try:
-            count = int(output.strip())
-            if count > 0:
-                return CheckResult(
-                    name="updates",
-                    status=Status.WARNING,
-                    message=f"Updates: {count} pending (yum)"
-                )
-            else:
-                return CheckResult(
-                    name="updates",
-                    status=Status.OK,
-                    message="Updates: Up to date"
-                )
-        except ValueError:
-            pass
+    if manager in ("apt", "dnf", "yum"):
+        # apt prints a "Listing..." header; dnf/yum print one package per line
+        count = sum(
+            1 for line in listing.split("\n")
+            if line.strip() and not line.startswith("Listing")
+        )
+        if count > 0:
+            return CheckResult(
+                name="updates",
+                status=Status.WARNING,
+                message=f"Updates: {count} pending ({manager})"
+            )
+        else:
+            return CheckResult(
+                name="updates",
+                status=Status.OK,
+                message="Updates: Up to date"
+            )
 
     # No package manager found or working
     return CheckResult(
@@ -205,9 +319,10 @@ def check_ssh_host(host_config: dict, thresholds: dict) -> list[CheckResult]:
             message=f"{name}: No host configured"
         )]
 
-    # First, verify connectivity
-    success, _ = _run_ssh(host, user, "echo ok", timeout=15)
-    if not success:
+    # Verify connectivity and run every check in a single SSH session
+    sections = [check for check in SECTION_COMMANDS if check in checks]
+    outputs = _run_sections(host, user, sections)
+    if outputs is None:
         return [CheckResult(
             name=name,
             status=Status.ERROR,
@@ -218,22 +333,21 @@ def check_ssh_host(host_config: dict, thresholds: dict) -> list[CheckResult]:
     all_ok = True
 
     for check in checks:
-        if check == "disk":
-            result = _check_disk(host, user, thresholds)
-            if result:
-                if result.status != Status.OK:
-                    all_ok = False
-                    # Prefix with host name
-                    result.message = f"{name}: {result.message}"
-                    results.append(result)
+        if check not in outputs:
+            continue
 
+        if check == "disk":
+            result = _check_disk(outputs[check], thresholds)
         elif check == "updates":
-            result = _check_updates(host, user)
-            if result:
-                if result.status != Status.OK:
-                    all_ok = False
-                    result.message = f"{name}: {result.message}"
-                    results.append(result)
+            result = _check_updates(outputs[check])
+        else:
+            continue
+
+        if result.status != Status.OK:
+            all_ok = False
+            # Prefix with host name
+            result.message = f"{name}: {result.message}"
+            results.append(result)
 
     # If all checks passed, just show one OK line
     if all_ok:
@@ -260,9 +374,14 @@ def check_ssh_hosts(hosts: list[dict], thresholds: dict) -> list[CheckResult]:
     if not hosts:
         return []
 
+    # Hosts are independent, so check them concurrently (order is kept)
+    with ThreadPoolExecutor(max_workers=min(16, len(hosts))) as executor:
+        host_results = list(executor.map(
+            lambda h: check_ssh_host(h, thresholds), hosts
+        ))
+
     all_results = []
-    for host_config in hosts:
-        results = check_ssh_host(host_config, thresholds)
+    for results in host_results:
         all_results.extend(results)
 
     return all_results
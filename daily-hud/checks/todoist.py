@@ -2,23 +2,108 @@
 Todoist integration - fetch tasks due today and overdue.
 """
 
+import hashlib
+import json
 import requests
-from datetime import datetime, date
+from collections import defaultdict
+from datetime import date
 from typing import Optional
 
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+from urllib3.util.retry import Retry
+
+import cache
 from output import CheckResult, Status
 
+# Prefer orjson for response bodies, falling back to stdlib json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-TODOIST_API_URL = "https://api.todoist.com/rest/v2"
+# Stream-parse the task list when ijson is available
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    _JSON_ERRORS = (ValueError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    _JSON_ERRORS = (ValueError,)
 
 
-def check_todoist(token: Optional[str], config: dict) -> list[CheckResult]:
+TODOIST_API_URL = "https://api.todoist.com/rest/v2"
+
+# Only tasks the dashboard shows; "today" is evaluated in the user's timezone
+TASK_FILTER = "today | overdue"
+
+# Task fields the check reads; everything else is dropped while parsing
+TASK_FIELDS = ("content", "project_id", "due")
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 15)
+
+# Retry transient failures with backoff; a dead host still fails fast.
+# Read timeouts are not retried, so a hung endpoint costs one read timeout.
+RETRY_POLICY = Retry(
+    total=3,
+    connect=1,
+    read=False,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Reuse keep-alive connections to api.todoist.com across requests
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=RETRY_POLICY,
+))
+
+
+def _fetch_tasks(token: str) -> list[dict]:
+    """Fetch active tasks that are due today or overdue, trimmed to TASK_FIELDS."""
+    # The API ignores project_id when a filter is given, so project
+    # filtering stays client-side
+    response = _SESSION.get(
+        f"{TODOIST_API_URL}/tasks",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"filter": TASK_FILTER},
+        timeout=REQUEST_TIMEOUT,
+        stream=True
+    )
+    with response:
+        response.raise_for_status()
+        try:
+            if IJSON_AVAILABLE:
+                # Let urllib3 undo any gzip so ijson sees plain JSON
+                response.raw.decode_content = True
+                tasks = ijson.items(response.raw, "item", use_float=True)
+            else:
+                tasks = _loads(response.content)
+            return [{key: task[key] for key in TASK_FIELDS if key in task} for task in tasks]
+        except _JSON_ERRORS as e:
+            # Surface bad bodies as a RequestException, like response.json()
+            raise requests.exceptions.InvalidJSONError(e, response=response)
+        except Urllib3Error as e:
+            # Reading response.raw directly bypasses requests' error wrapping
+            raise requests.exceptions.ConnectionError(e, response=response)
+
+
+def check_todoist(token: Optional[str], config: dict,
+                  cache_config: dict) -> list[CheckResult]:
     """
     Check Todoist for due and overdue tasks.
 
     Args:
         token: Todoist API token
         config: Todoist config section
+        cache_config: Cache configuration
 
     Returns:
         List of CheckResult objects
@@ -31,24 +116,34 @@ def check_todoist(token: Optional[str], config: dict) -> list[CheckResult]:
         )]
 
     try:
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # Fetch active tasks
-        response = requests.get(
-            f"{TODOIST_API_URL}/tasks",
-            headers=headers,
-            timeout=15
+        # Fetch due and overdue tasks, reusing a very recent or last-good list
+        use_cache = cache_config.get("enabled", True)
+        cache_dir = cache_config.get("directory", "~/.cache/daily-hud")
+        cache_hours = cache_config.get("durations", {}).get("todoist", 0.5 / 60)
+        token_key = hashlib.sha256(token.encode()).hexdigest()[:16]
+        cache_key = f"{token_key}:{TASK_FILTER}"
+
+        tasks, stale = cache.get_or_fetch(
+            cache_dir, "todoist", cache_key, cache_hours,
+            lambda: _fetch_tasks(token),
+            enabled=use_cache,
+            max_stale_hours=cache.stale_limit(cache_config, cache_hours)
         )
-        response.raise_for_status()
-        tasks = response.json()
 
         # Filter to tasks with due dates
         today = date.today()
-        overdue = []
+        # Overdue task names bucketed by days overdue, so no sort is needed
+        overdue_by_days = defaultdict(list)
+        overdue_count = 0
         due_today = []
-        project_filter = config.get("projects", [])
+        # Project IDs are strings in the API, but may be written unquoted in YAML
+        project_filter = frozenset(str(p) for p in config.get("projects") or ())
 
         for task in tasks:
+            # Filter by project if specified
+            if project_filter and task.get("project_id") not in project_filter:
+                continue
+
             due = task.get("due")
             if not due:
                 continue
@@ -59,37 +154,28 @@ def check_todoist(token: Optional[str], config: dict) -> list[CheckResult]:
                 continue
 
             try:
-                # Handle both date and datetime formats
-                if "T" in due_date_str:
-                    due_date = datetime.fromisoformat(due_date_str.replace("Z", "+00:00")).date()
-                else:
-                    due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
+                # Both date and datetime formats start with YYYY-MM-DD
+                due_date = date(
+                    int(due_date_str[:4]), int(due_date_str[5:7]), int(due_date_str[8:10])
+                )
             except ValueError:
                 continue
 
-            # Filter by project if specified
-            if project_filter:
-                project_id = task.get("project_id")
-                if project_id not in project_filter:
-                    continue
-
-            # Categorize
-            task_info = {
-                "content": task.get("content", "Untitled"),
-                "due_date": due_date,
-                "due_string": due.get("string", ""),
-            }
-
+            # Categorize; the API filter already limited this to today and overdue
+            content = task.get("content", "Untitled")
             if due_date < today:
-                days_overdue = (today - due_date).days
-                task_info["days_overdue"] = days_overdue
-                overdue.append(task_info)
-            elif due_date == today:
-                due_today.append(task_info)
+                overdue_by_days[(today - due_date).days].append(content)
+                overdue_count += 1
+            else:
+                due_today.append({
+                    "content": content,
+                    "due_date": due_date,
+                    "due_string": due.get("string", ""),
+                })
 
         # Build result
         results = []
-        total_tasks = len(overdue) + len(due_today)
+        total_tasks = overdue_count + len(due_today)
 
         if total_tasks == 0:
             results.append(CheckResult(
@@ -99,9 +185,9 @@ def check_todoist(token: Optional[str], config: dict) -> list[CheckResult]:
             ))
         else:
             # Determine status based on overdue
-            if overdue:
+            if overdue_count:
                 status = Status.WARNING
-                msg = f"Todoist: {len(due_today)} due today, {len(overdue)} overdue"
+                msg = f"Todoist: {len(due_today)} due today, {overdue_count} overdue"
             else:
                 status = Status.OK
                 msg = f"Todoist: {len(due_today)} task{'s' if len(due_today) != 1 else ''} due today"
@@ -112,11 +198,11 @@ def check_todoist(token: Optional[str], config: dict) -> list[CheckResult]:
                 message=msg
             )
 
-            # Add overdue details first
-            for task in sorted(overdue, key=lambda t: t["days_overdue"], reverse=True):
-                days = task["days_overdue"]
+            # Add overdue details first, most overdue first
+            for days in sorted(overdue_by_days, reverse=True):
                 day_str = "day" if days == 1 else "days"
-                result.add_detail(f"[!] Overdue ({days} {day_str}): {task['content']}")
+                for content in overdue_by_days[days]:
+                    result.add_detail(f"[!] Overdue ({days} {day_str}): {content}")
 
             # Add today's tasks
             for task in due_today:
@@ -125,6 +211,10 @@ def check_todoist(token: Optional[str], config: dict) -> list[CheckResult]:
 
             results.append(result)
 
+        if stale is not None:
+            for result in results:
+                result.mark_stale(stale)
+
         return results
 
     except requests.exceptions.Timeout:
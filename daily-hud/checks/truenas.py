@@ -2,17 +2,107 @@
 TrueNAS integration via REST API.
 """
 
+import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import urllib3
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import cache
 from output import CheckResult, Status
 
+# Prefer orjson for response bodies, falling back to stdlib json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Stream-parse list endpoints when ijson is available
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    _JSON_ERRORS = (ValueError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    _JSON_ERRORS = (ValueError,)
+
 # Disable SSL warnings for self-signed certs (common in homelab)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# (connect, read) timeouts in seconds; the update check can be slow
+REQUEST_TIMEOUT = (3.05, 15)
+UPDATE_CHECK_TIMEOUT = (3.05, 30)
+
+# Pool fields the check reads; the vdev topology in particular can be large
+POOL_FIELDS = ("name", "status", "used", "free")
+
+# Retry transient failures with backoff; a dead host still fails fast.
+# Read timeouts are not retried, so a hung endpoint costs one read timeout.
+RETRY_POLICY = Retry(
+    total=3,
+    connect=1,
+    read=False,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Reuse one keep-alive connection for all calls to the TrueNAS host
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=RETRY_POLICY,
+))
+
+# The update check already has a generous timeout, so retry it only once
+_UPDATE_SESSION = requests.Session()
+_UPDATE_SESSION.mount("https://", HTTPAdapter(
+    max_retries=RETRY_POLICY.new(total=1),
+))
+
+
+def _get_json(url: str, headers: dict, timeout: tuple,
+              session: requests.Session = _SESSION,
+              item_fields: Optional[tuple] = None):
+    """
+    GET a TrueNAS API endpoint and return the parsed JSON body.
+
+    If item_fields is given, the body must be a list; it is stream-parsed
+    and each item is trimmed to those fields.
+    """
+    # verify is passed per request: a session-level verify=False is
+    # overridden by REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE in the environment
+    response = session.get(url, headers=headers, verify=False, timeout=timeout,
+                           stream=item_fields is not None)
+    with response:
+        response.raise_for_status()
+        try:
+            if item_fields is None:
+                return _loads(response.content)
+            if IJSON_AVAILABLE:
+                # Let urllib3 undo any gzip so ijson sees plain JSON
+                response.raw.decode_content = True
+                items = ijson.items(response.raw, "item", use_float=True)
+            else:
+                items = _loads(response.content)
+            return [{key: item[key] for key in item_fields if key in item} for item in items]
+        except _JSON_ERRORS as e:
+            # Surface bad bodies as a RequestException, like response.json()
+            raise requests.exceptions.InvalidJSONError(e, response=response)
+        except urllib3.exceptions.HTTPError as e:
+            # Reading response.raw directly bypasses requests' error wrapping
+            raise requests.exceptions.ConnectionError(e, response=response)
+
 
-def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[CheckResult]:
+def check_truenas(host: str, api_key: Optional[str], config: dict,
+                  cache_config: dict) -> list[CheckResult]:
     """
     Check TrueNAS status via REST API.
 
@@ -20,6 +110,7 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
         host: TrueNAS hostname or IP
         api_key: TrueNAS API key
         config: Full config with thresholds
+        cache_config: Cache configuration
 
     Returns:
         List of CheckResult objects
@@ -44,18 +135,44 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
     disk_warn = thresholds.get("disk_warning_percent", 80)
     disk_crit = thresholds.get("disk_critical_percent", 90)
 
+    # Handle caching; each endpoint has its own freshness, and a recent
+    # last-good response is reused (as a warning) if the host is unreachable
+    use_cache = cache_config.get("enabled", True)
+    cache_dir = cache_config.get("directory", "~/.cache/daily-hud")
+    durations = cache_config.get("durations", {})
+
+    def fetch(endpoint: str, name: str, default_hours: float, timeout: tuple,
+              session: requests.Session = _SESSION,
+              item_fields: Optional[tuple] = None):
+        max_age = durations.get(name, default_hours)
+        return cache.get_or_fetch(
+            cache_dir, name, host, max_age,
+            lambda: _get_json(
+                f"{base_url}/{endpoint}", headers, timeout, session, item_fields
+            ),
+            enabled=use_cache,
+            max_stale_hours=cache.stale_limit(cache_config, max_age)
+        )
+
+    # The three endpoints are independent, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        info_future = executor.submit(
+            fetch, "system/info", "truenas_info", 5 / 60, REQUEST_TIMEOUT
+        )
+        pools_future = executor.submit(
+            fetch, "pool", "truenas_pools", 1 / 60, REQUEST_TIMEOUT,
+            item_fields=POOL_FIELDS
+        )
+        update_future = executor.submit(
+            fetch, "update/check_available", "truenas_updates", 1,
+            UPDATE_CHECK_TIMEOUT, _UPDATE_SESSION
+        )
+
     results = []
 
     # Check system info
     try:
-        response = requests.get(
-            f"{base_url}/system/info",
-            headers=headers,
-            verify=False,
-            timeout=15
-        )
-        response.raise_for_status()
-        system_info = response.json()
+        system_info, info_stale = info_future.result()
 
         # System is reachable
         version = system_info.get("version", "unknown")
@@ -82,14 +199,7 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
 
     # Check pools
     try:
-        response = requests.get(
-            f"{base_url}/pool",
-            headers=headers,
-            verify=False,
-            timeout=15
-        )
-        response.raise_for_status()
-        pools = response.json()
+        pools, pools_stale = pools_future.result()
 
         pool_warnings = []
         pool_errors = []
@@ -98,8 +208,6 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
             name = pool.get("name", "unknown")
             status = pool.get("status", "UNKNOWN")
 
-            # Get usage from topology
-            topology = pool.get("topology", {})
             # Calculate used/free from the pool properties
             used = pool.get("used", {}).get("parsed", 0)
             free = pool.get("free", {}).get("parsed", 0)
@@ -132,7 +240,6 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
             )
             for err in pool_errors:
                 result.add_detail(err)
-            results.append(result)
         elif pool_warnings:
             result = CheckResult(
                 name="truenas-storage",
@@ -141,13 +248,16 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
             )
             for warn in pool_warnings:
                 result.add_detail(warn)
-            results.append(result)
         else:
-            results.append(CheckResult(
+            result = CheckResult(
                 name="truenas-storage",
                 status=Status.OK,
                 message=f"Storage: {len(pools)} pool(s) OK"
-            ))
+            )
+
+        if pools_stale is not None:
+            result.mark_stale(pools_stale)
+        results.append(result)
 
     except requests.exceptions.RequestException:
         results.append(CheckResult(
@@ -158,28 +268,25 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
 
     # Check for updates
     try:
-        response = requests.get(
-            f"{base_url}/update/check_available",
-            headers=headers,
-            verify=False,
-            timeout=30  # This can be slow
-        )
-        response.raise_for_status()
-        update_info = response.json()
+        update_info, update_stale = update_future.result()
 
         if update_info.get("status") == "AVAILABLE":
             version = update_info.get("version", "unknown")
-            results.append(CheckResult(
+            result = CheckResult(
                 name="truenas-updates",
                 status=Status.WARNING,
                 message=f"Updates: {version} available"
-            ))
+            )
         else:
-            results.append(CheckResult(
+            result = CheckResult(
                 name="truenas-updates",
                 status=Status.OK,
                 message="Updates: Up to date"
-            ))
+            )
+
+        if update_stale is not None:
+            result.mark_stale(update_stale)
+        results.append(result)
 
     except requests.exceptions.RequestException:
         results.append(CheckResult(
@@ -189,10 +296,13 @@ def check_truenas(host: str, api_key: Optional[str], config: dict) -> list[Check
         ))
 
     # Add system status as first result
-    results.insert(0, CheckResult(
+    system_result = CheckResult(
         name="truenas-system",
         status=Status.OK,
         message=f"System: OK ({hostname})"
-    ))
+    )
+    if info_stale is not None:
+        system_result.mark_stale(info_stale)
+    results.insert(0, system_result)
 
     return results
@@ -1,23 +1,68 @@
 """
 Windows host checks via SSH or WinRM.
+
+SSH connections share the ControlMaster sockets used by the Linux host
+checks, so repeated runs skip the handshake. Each host's raw section
+output is also cached briefly, so back-to-back runs skip SSH entirely.
 """
 
+import base64
+import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+import cache
+from checks.ssh_hosts import shared_connection
 from output import CheckResult, Status
 
 
+# Each check's PowerShell snippet, run together in one SSH session. Output
+# of each section follows its marker line.
+PROBE_MARKER = "__PROBE_OK__"
+SECTION_COMMANDS = {
+    "disk": (
+        "Get-PSDrive -PSProvider FileSystem | "
+        "Where-Object { $_.Used -gt 0 } | "
+        "Select-Object Name, "
+        "@{n='pct';e={[math]::Round(($_.Used / ($_.Used + $_.Free)) * 100)}}, "
+        "@{n='freeGB';e={[math]::Round($_.Free / 1GB, 1)}} | "
+        "ConvertTo-Json -Compress"
+    ),
+    # Counting updates requires admin and PSWindowsUpdate; without it, report
+    # whether the Windows Update service is at least present
+    "updates": (
+        "try { "
+        "Write-Output (Get-WindowsUpdate -ErrorAction Stop).Count "
+        "} catch { "
+        "Write-Output 'unavailable'; "
+        "try { Write-Output \"wuauserv: $((Get-Service wuauserv -ErrorAction Stop).Status)\" } catch { } "
+        "}"
+    ),
+}
+
+
 def _run_ssh(host: str, user: str, command: str,
              timeout: int = 30) -> tuple[bool, str]:
     """Run a PowerShell command via SSH."""
-    ssh_cmd = [
-        "ssh",
+    # Pass the script base64-encoded so multi-line scripts and quotes
+    # survive the remote shell untouched
+    encoded = base64.b64encode(command.encode("utf-16-le")).decode()
+    ssh_options = [
         "-o", "BatchMode=yes",
         "-o", "ConnectTimeout=10",
         "-o", "StrictHostKeyChecking=accept-new",
+    ]
+    error, control_options = shared_connection(ssh_options, f"{user}@{host}")
+    if error is not None:
+        return False, error
+
+    ssh_cmd = [
+        "ssh",
+        *ssh_options,
+        *control_options,
         f"{user}@{host}",
-        f"powershell -Command \"{command}\""
+        f"powershell -NoProfile -NonInteractive -EncodedCommand {encoded}"
     ]
 
     try:
@@ -37,48 +82,79 @@ def _run_ssh(host: str, user: str, command: str,
         return False, "ssh not found in PATH"
 
 
-def _check_disk_ssh(host: str, user: str, thresholds: dict) -> Optional[CheckResult]:
-    """Check disk usage on Windows via SSH."""
-    warn_pct = thresholds.get("disk_warning_percent", 80)
-    crit_pct = thresholds.get("disk_critical_percent", 90)
+def _marker(section: str) -> str:
+    """Get the output marker line for a section."""
+    return f"__{section.upper()}__"
 
-    # PowerShell command to get drive info
-    ps_cmd = (
-        "Get-PSDrive -PSProvider FileSystem | "
-        "Where-Object { $_.Used -gt 0 } | "
-        "ForEach-Object { "
-        "$pct = [math]::Round(($_.Used / ($_.Used + $_.Free)) * 100); "
-        "$freeGB = [math]::Round($_.Free / 1GB, 1); "
-        "Write-Output \\\"$($_.Name): $pct% ($($freeGB)GB free)\\\" "
-        "}"
-    )
 
-    success, output = _run_ssh(host, user, ps_cmd)
+def _run_sections(host: str, user: str,
+                  sections: list[str]) -> Optional[dict[str, str]]:
+    """
+    Run the probe and all requested sections in a single SSH invocation.
+
+    Returns:
+        Dict mapping section name to its output, or None if the host
+        could not be reached
+    """
+    script = [f"Write-Output '{PROBE_MARKER}'"]
+    for section in sections:
+        script.append(f"Write-Output '{_marker(section)}'")
+        script.append(SECTION_COMMANDS[section])
+
+    success, output = _run_ssh(host, user, "\n".join(script), timeout=90)
     if not success:
         return None
 
+    markers = {_marker(section): section for section in sections}
+    outputs = {}
+    current = None
+    probed = False
+
+    for line in output.splitlines():
+        line = line.strip()
+        if line == PROBE_MARKER:
+            probed = True
+        elif line in markers:
+            current = markers[line]
+            outputs[current] = []
+        elif current:
+            outputs[current].append(line)
+
+    if not probed:
+        return None
+
+    return {section: "\n".join(lines) for section, lines in outputs.items()}
+
+
+def _parse_disk_output(output: str, thresholds: dict) -> CheckResult:
+    """Check disk usage from the PowerShell drive listing (JSON)."""
+    warn_pct = thresholds.get("disk_warning_percent", 80)
+    crit_pct = thresholds.get("disk_critical_percent", 90)
+
     warnings = []
     errors = []
 
-    for line in output.split("\n"):
-        if not line.strip() or ":" not in line:
-            continue
+    # ConvertTo-Json emits a bare object for a single drive, nothing for none
+    try:
+        drives = json.loads(output) if output else []
+    except ValueError:
+        drives = []
+    if isinstance(drives, dict):
+        drives = [drives]
 
-        # Parse "C: 75% (120GB free)"
+    for drive in drives:
         try:
-            drive = line.split(":")[0].strip()
-            rest = line.split(":")[1].strip()
-            pct_str = rest.split("%")[0].strip()
-            pct = int(pct_str)
-            free_info = rest.split("(")[1].rstrip(")") if "(" in rest else ""
-
-            if pct >= crit_pct:
-                errors.append(f"{drive}: {pct}% ({free_info})")
-            elif pct >= warn_pct:
-                warnings.append(f"{drive}: {pct}% ({free_info})")
-        except (ValueError, IndexError):
+            name = drive["Name"]
+            pct = int(drive["pct"])
+            free_info = f"{drive['freeGB']}GB free"
+        except (KeyError, TypeError, ValueError):
             continue
 
+        if pct >= crit_pct:
+            errors.append(f"{name}: {pct}% ({free_info})")
+        elif pct >= warn_pct:
+            warnings.append(f"{name}: {pct}% ({free_info})")
+
     if errors:
         result = CheckResult(
             name="disk",
@@ -105,29 +181,13 @@ def _check_disk_ssh(host: str, user: str, thresholds: dict) -> Optional[CheckRes
         )
 
 
-def _check_updates_ssh(host: str, user: str) -> Optional[CheckResult]:
-    """Check for Windows updates via SSH."""
-    # This requires PSWindowsUpdate module or we check Windows Update service
-    # Simplified: just check if updates are pending via registry/service
-
-    # Try to count pending updates (requires admin and PSWindowsUpdate)
-    ps_cmd = (
-        "try { "
-        "$updates = (Get-WindowsUpdate -ErrorAction Stop).Count; "
-        "Write-Output $updates "
-        "} catch { "
-        "Write-Output 'unavailable' "
-        "}"
-    )
-
-    success, output = _run_ssh(host, user, ps_cmd, timeout=60)
-
-    if not success or output.strip() == "unavailable":
-        # Fallback: check Windows Update service status
-        ps_cmd2 = "(Get-Service wuauserv).Status"
-        success2, output2 = _run_ssh(host, user, ps_cmd2)
+def _parse_updates_output(output: str) -> Optional[CheckResult]:
+    """Check for Windows updates from the PowerShell update count."""
+    lines = output.split("\n")
 
-        if success2:
+    if lines[0] == "unavailable":
+        # Fallback: Windows Update service is present but can't be queried
+        if any(line.startswith("wuauserv:") for line in lines[1:]):
             return CheckResult(
                 name="updates",
                 status=Status.OK,
@@ -136,7 +196,7 @@ def _check_updates_ssh(host: str, user: str) -> Optional[CheckResult]:
         return None
 
     try:
-        count = int(output.strip())
+        count = int(lines[0])
         if count > 0:
             return CheckResult(
                 name="updates",
@@ -157,13 +217,15 @@ def _check_updates_ssh(host: str, user: str) -> Optional[CheckResult]:
         )
 
 
-def check_windows_host(host_config: dict, thresholds: dict) -> list[CheckResult]:
+def check_windows_host(host_config: dict, thresholds: dict,
+                       cache_config: dict) -> list[CheckResult]:
     """
     Run all configured checks on a single Windows host.
 
     Args:
         host_config: Host configuration
         thresholds: Global thresholds
+        cache_config: Cache configuration
 
     Returns:
         List of CheckResult objects
@@ -189,30 +251,51 @@ def check_windows_host(host_config: dict, thresholds: dict) -> list[CheckResult]
             message=f"{name}: WinRM not yet supported (use SSH)"
         )]
 
-    # Verify connectivity
-    success, _ = _run_ssh(host, user, "Write-Output 'ok'", timeout=15)
-    if not success:
-        return [CheckResult(
-            name=name,
-            status=Status.ERROR,
-            message=f"{name}: Connection failed"
-        )]
+    # Verify connectivity and run every check in a single SSH session
+    sections = [check for check in SECTION_COMMANDS if check in checks]
+
+    # Reuse a recent probe of the same host and sections; a failed probe
+    # is never cached, so an unreachable host always reports an error
+    use_cache = cache_config.get("enabled", True)
+    cache_dir = cache_config.get("directory", "~/.cache/daily-hud")
+    cache_hours = cache_config.get("durations", {}).get("windows", 2 / 60)
+    cache_name = f"windows_{host}"
+    cache_key = f"{user}@{host}:{','.join(sections)}"
+
+    outputs = None
+    if use_cache:
+        cached_data = cache.load(cache_dir, cache_name, cache_hours)
+        if cached_data.get("key") == cache_key:
+            outputs = cached_data.get("outputs")
+
+    if outputs is None:
+        outputs = _run_sections(host, user, sections)
+        if outputs is None:
+            return [CheckResult(
+                name=name,
+                status=Status.ERROR,
+                message=f"{name}: Connection failed"
+            )]
+        if use_cache:
+            cache.save(cache_dir, cache_name, {"key": cache_key, "outputs": outputs})
 
     results = []
     all_ok = True
     update_info = ""
 
     for check in checks:
+        if check not in outputs:
+            continue
+
         if check == "disk":
-            result = _check_disk_ssh(host, user, thresholds)
-            if result:
-                if result.status != Status.OK:
-                    all_ok = False
-                    result.message = f"{name}: {result.message}"
-                    results.append(result)
+            result = _parse_disk_output(outputs[check], thresholds)
+            if result.status != Status.OK:
+                all_ok = False
+                result.message = f"{name}: {result.message}"
+                results.append(result)
 
         elif check == "updates":
-            result = _check_updates_ssh(host, user)
+            result = _parse_updates_output(outputs[check])
             if result:
                 if result.status == Status.WARNING:
                     # For updates, we just note it but don't expand
@@ -233,13 +316,15 @@ def check_windows_host(host_config: dict, thresholds: dict) -> list[CheckResult]
     return results
 
 
-def check_windows_hosts(hosts: list[dict], thresholds: dict) -> list[CheckResult]:
+def check_windows_hosts(hosts: list[dict], thresholds: dict,
+                        cache_config: dict) -> list[CheckResult]:
     """
     Check all configured Windows hosts.
 
     Args:
         hosts: List of host configurations
         thresholds: Global thresholds
+        cache_config: Cache configuration
 
     Returns:
         List of CheckResult objects
@@ -247,9 +332,14 @@ def check_windows_hosts(hosts: list[dict], thresholds: dict) -> list[CheckResult
     if not hosts:
         return []
 
+    # Hosts are independent, so check them concurrently (order is kept)
+    with ThreadPoolExecutor(max_workers=min(8, len(hosts))) as executor:
+        host_results = list(executor.map(
+            lambda h: check_windows_host(h, thresholds, cache_config), hosts
+        ))
+
     all_results = []
-    for host_config in hosts:
-        results = check_windows_host(host_config, thresholds)
+    for results in host_results:
         all_results.extend(results)
 
     return all_results
@@ -16,72 +16,105 @@ Options:
 """
 
 import argparse
+import importlib
 import json
 import os
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import yaml
+# Prefer orjson for --json output, falling back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from output import (
-    CheckResult, Status, supports_color,
+    CheckResult, OutputContext, Status, supports_color, flush_output,
     print_header, print_section_results, print_summary, results_to_json
 )
 from secrets import get_secrets, SecretsError
 
-from checks.todoist import check_todoist
-from checks.github import check_github
-from checks.kubernetes import check_kubernetes
-from checks.truenas import check_truenas
-from checks.ssh_hosts import check_ssh_hosts
-from checks.windows import check_windows_hosts
-from checks.certs import check_certificates
-from checks.domains import check_domains
-from checks.cves import check_cves
-from checks.containers import check_containers
-
 
 DEFAULT_CONFIG_PATH = "~/.config/daily-hud/config.yaml"
 
-# Map of check names to their functions and required config sections
+# Map of check names to their functions and required config sections.
+# Check modules are imported on first use, so narrow --only runs don't pay
+# for every check's dependencies. Timeouts are per-check deadlines in
+# seconds, sized so a check whose connect is retried and whose slowest
+# request runs to its full read timeout still finishes; a check stuck in
+# further retries is cut off and reported as timed out. Override with
+# thresholds.check_timeouts.<name>; thresholds.check_timeout_seconds from
+# older configs raises every other check's deadline to at least that value.
 CHECKS = {
     "todoist": {
         "section": "Todoist",
+        "module": "checks.todoist",
+        "function": "check_todoist",
         "requires_secret": "todoist_token",
+        "timeout": 25,
     },
     "github": {
         "section": "GitHub",
+        "module": "checks.github",
+        "function": "check_github",
         "requires_secret": "github_token",
+        "timeout": 20,
     },
     "kubernetes": {
         "section": "Kubernetes",
+        "module": "checks.kubernetes",
+        "function": "check_kubernetes",
+        "timeout": 35,
     },
     "truenas": {
         "section": "TrueNAS",
+        "module": "checks.truenas",
+        "function": "check_truenas",
         "requires_secret": "truenas_api_key",
+        "timeout": 40,
     },
     "ssh": {
         "section": "SSH Hosts",
+        "module": "checks.ssh_hosts",
+        "function": "check_ssh_hosts",
+        "timeout": 95,
     },
     "windows": {
         "section": "Windows",
+        "module": "checks.windows",
+        "function": "check_windows_hosts",
+        "timeout": 95,
     },
     "certs": {
         "section": "Certificates",
+        "module": "checks.certs",
+        "function": "check_certificates",
+        "timeout": 15,
     },
     "domains": {
         "section": "Domains",
+        "module": "checks.domains",
+        "function": "check_domains",
+        "timeout": 30,
     },
     "cves": {
         "section": "Security",
+        "module": "checks.cves",
+        "function": "check_cves",
+        "timeout": 60,
     },
     "containers": {
         "section": "Containers",
+        "module": "checks.containers",
+        "function": "check_containers",
+        "timeout": 310,
     },
 }
 
@@ -95,14 +128,31 @@ def load_config(config_path: str) -> dict:
         print(f"Create it from config.example.yaml", file=sys.stderr)
         sys.exit(1)
 
+    # Import yaml only once a config actually needs parsing
+    import yaml
+
+    # Use the libyaml C parser when available
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
     try:
         with open(path, "r") as f:
-            config = yaml.safe_load(f) or {}
-        return config
+            config = yaml.load(f, Loader=SafeLoader) or {}
     except yaml.YAMLError as e:
         print(f"Error parsing config file: {e}", file=sys.stderr)
         sys.exit(1)
 
+    return config
+
+
+def _load_check(check_name: str):
+    """Import a check's module and return its check function."""
+    check_info = CHECKS[check_name]
+    module = importlib.import_module(check_info["module"])
+    return getattr(module, check_info["function"])
+
 
 def run_check(check_name: str, config: dict, secrets: dict,
               thresholds: dict, cache_config: dict) -> tuple[str, list[CheckResult]]:
@@ -116,50 +166,52 @@ def run_check(check_name: str, config: dict, secrets: dict,
     section = check_info.get("section", check_name.title())
 
     try:
+        check_func = _load_check(check_name) if check_name in CHECKS else None
+
         if check_name == "todoist":
             token = secrets.get("todoist_token")
             todoist_config = config.get("todoist", {})
-            results = check_todoist(token, todoist_config)
+            results = check_func(token, todoist_config, cache_config)
 
         elif check_name == "github":
             token = secrets.get("github_token")
             github_config = config.get("github", {})
-            results = check_github(token, github_config)
+            results = check_func(token, github_config, cache_config)
 
         elif check_name == "kubernetes":
             k8s_config = config.get("kubernetes", {})
             k8s_config["thresholds"] = thresholds
-            results = check_kubernetes(k8s_config)
+            results = check_func(k8s_config, cache_config)
 
         elif check_name == "truenas":
             truenas_config = config.get("truenas", {})
             host = truenas_config.get("host", "")
             api_key = secrets.get("truenas_api_key")
-            results = check_truenas(host, api_key, {"thresholds": thresholds})
+            results = check_func(host, api_key, {"thresholds": thresholds}, cache_config)
 
         elif check_name == "ssh":
             hosts = config.get("ssh_hosts", [])
-            results = check_ssh_hosts(hosts, thresholds)
+            results = check_func(hosts, thresholds)
 
         elif check_name == "windows":
             hosts = config.get("windows_hosts", [])
-            results = check_windows_hosts(hosts, thresholds)
+            results = check_func(hosts, thresholds, cache_config)
 
         elif check_name == "certs":
             targets = config.get("certificates", [])
-            results = check_certificates(targets, thresholds)
+            results = check_func(targets, thresholds)
 
         elif check_name == "domains":
             domains = config.get("domains", [])
-            results = check_domains(domains, thresholds, cache_config)
+            results = check_func(domains, thresholds, cache_config)
 
         elif check_name == "cves":
             cve_config = config.get("cves", {})
-            results = check_cves(cve_config, cache_config)
+            results = check_func(cve_config, cache_config)
 
         elif check_name == "containers":
             container_config = config.get("containers", {})
-            results = check_containers(container_config, cache_config)
+            results = check_func(container_config, cache_config)
 
         else:
             results = [CheckResult(
@@ -221,7 +273,7 @@ def main():
     thresholds = config.get("thresholds", {})
 
     # Handle caching
-    cache_config = config.get("cache", {})
+    cache_config = config.setdefault("cache", {})
     if args.no_cache:
         cache_config["enabled"] = False
 
@@ -280,48 +332,75 @@ def main():
     all_results = {}
     all_flat_results = []
 
-    timeout = thresholds.get("check_timeout_seconds", 30)
-
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        futures = {
-            executor.submit(
-                run_check, check_name, config, secrets, thresholds, cache_config
-            ): check_name
-            for check_name in checks_to_run
-        }
+    # Older configs set a single check_timeout_seconds for every check; it
+    # only ever extends the built-in deadlines, since some checks need more
+    check_timeouts = thresholds.get("check_timeouts", {})
+    legacy_timeout = thresholds.get("check_timeout_seconds", 0)
+    timeouts = {
+        name: check_timeouts.get(name, max(legacy_timeout, CHECKS[name]["timeout"]))
+        for name in checks_to_run
+    }
+
+    # Checks are I/O-bound, so give each its own worker rather than queueing
+    executor = ThreadPoolExecutor(max_workers=len(checks_to_run))
+    futures = {
+        executor.submit(
+            run_check, check_name, config, secrets, thresholds, cache_config
+        ): check_name
+        for check_name in checks_to_run
+    }
+
+    # Each check gets its own deadline measured from the start, so a slow
+    # check can't eat into the time allowed for the others
+    deadlines = {
+        future: start_time + timeouts[name]
+        for future, name in futures.items()
+    }
+
+    for future in sorted(futures, key=deadlines.get):
+        check_name = futures[future]
+        try:
+            remaining = max(0, deadlines[future] - time.time())
+            section, results = future.result(timeout=remaining)
+            all_results[section] = results
+            all_flat_results.extend(results)
+        except Exception as e:
+            section = CHECKS.get(check_name, {}).get("section", check_name.title())
+            error_result = CheckResult(
+                name=check_name,
+                status=Status.ERROR,
+                message=f"{section}: Timeout or error"
+            )
+            all_results[section] = [error_result]
+            all_flat_results.append(error_result)
 
-        for future in as_completed(futures, timeout=timeout * 2):
-            check_name = futures[future]
-            try:
-                section, results = future.result(timeout=timeout)
-                all_results[section] = results
-                all_flat_results.extend(results)
-            except Exception as e:
-                section = CHECKS.get(check_name, {}).get("section", check_name.title())
-                error_result = CheckResult(
-                    name=check_name,
-                    status=Status.ERROR,
-                    message=f"{section}: Timeout or error"
-                )
-                all_results[section] = [error_result]
-                all_flat_results.append(error_result)
+    # Don't wait for checks that missed their deadline
+    executor.shutdown(wait=False, cancel_futures=True)
+    hung = any(not future.done() for future in futures)
 
     elapsed = time.time() - start_time
+    status_counts = Counter(r.status for r in all_flat_results)
 
     # Output results
     if args.json_output:
         output = {
             "results": results_to_json(all_results),
             "summary": {
-                "ok": sum(1 for r in all_flat_results if r.status == Status.OK),
-                "warnings": sum(1 for r in all_flat_results if r.status == Status.WARNING),
-                "errors": sum(1 for r in all_flat_results if r.status == Status.ERROR),
+                "ok": status_counts[Status.OK],
+                "warnings": status_counts[Status.WARNING],
+                "errors": status_counts[Status.ERROR],
                 "elapsed_seconds": round(elapsed, 2),
             }
         }
-        print(json.dumps(output, indent=2))
+        if ORJSON_AVAILABLE:
+            sys.stdout.buffer.write(orjson.dumps(
+                output, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+            ))
+        else:
+            print(json.dumps(output, indent=2))
     else:
-        print_header(use_color)
+        output_ctx = OutputContext.create(use_color)
+        print_header(output_ctx)
 
         # Print sections in a sensible order
         section_order = [
@@ -335,7 +414,7 @@ def main():
                 print_section_results(
                     section,
                     all_results[section],
-                    use_color,
+                    output_ctx,
                     args.verbose
                 )
 
@@ -345,22 +424,27 @@ def main():
                 print_section_results(
                     section,
                     all_results[section],
-                    use_color,
+                    output_ctx,
                     args.verbose
                 )
 
-        print_summary(all_flat_results, elapsed, use_color)
+        print_summary(all_flat_results, elapsed, output_ctx)
 
     # Exit code based on results
-    has_errors = any(r.status == Status.ERROR for r in all_flat_results)
-    has_warnings = any(r.status == Status.WARNING for r in all_flat_results)
-
-    if has_errors:
-        sys.exit(2)
-    elif has_warnings:
-        sys.exit(1)
+    if status_counts[Status.ERROR]:
+        exit_code = 2
+    elif status_counts[Status.WARNING]:
+        exit_code = 1
     else:
-        sys.exit(0)
+        exit_code = 0
+
+    if hung:
+        # The interpreter joins executor threads at exit, so a check that
+        # is still running would hold the process open; skip that wait
+        flush_output()
+        sys.stderr.flush()
+        os._exit(exit_code)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
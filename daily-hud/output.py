@@ -3,21 +3,30 @@ Terminal output formatting with colors and symbols.
 """
 
 import sys
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional
 
+# stdout is line-buffered on a TTY, costing a write() per line of the HUD.
+# Block-buffer it instead; flush_output() pushes everything out at the end.
+try:
+    sys.stdout.reconfigure(line_buffering=False)
+except (AttributeError, ValueError):
+    pass
 
-class Status(Enum):
-    """Check result status levels."""
+
+class Status(str, Enum):
+    """Check result status levels; members are their own string values."""
     OK = "ok"
     WARNING = "warning"
     ERROR = "error"
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckResult:
     """Result from a single check."""
     name: str
@@ -28,6 +37,14 @@ class CheckResult:
     def add_detail(self, detail: str):
         self.details.append(detail)
 
+    def mark_stale(self, age_hours: float):
+        """Flag a result built from a last-good cached value."""
+        minutes = max(1, round(age_hours * 60))
+        age = f"{minutes}m" if minutes < 120 else f"{age_hours:.0f}h"
+        self.message += f" (cached {age} ago)"
+        if self.status == Status.OK:
+            self.status = Status.WARNING
+
 
 # ANSI color codes
 class Colors:
@@ -50,9 +67,27 @@ SYMBOLS = {
     Status.UNKNOWN: (Colors.WHITE, "?"),
 }
 
+# Formatted symbols for each (status, use_color) pair, built once
+_STATUS_FORMATTED = {
+    **{(status, True): f"{color}{symbol}{Colors.RESET}"
+       for status, (color, symbol) in SYMBOLS.items()},
+    **{(status, False): symbol for status, (color, symbol) in SYMBOLS.items()},
+}
+
+# Placeholder line for a section with no results
+_NO_DATA_COLOR = f"{_STATUS_FORMATTED[(Status.UNKNOWN, True)]} No data available"
+_NO_DATA_PLAIN = f"{_STATUS_FORMATTED[(Status.UNKNOWN, False)]} No data available"
 
+# Header title style, separator lines and section header padding
+_TITLE_STYLE = Colors.BOLD + Colors.WHITE
+_HLINE = "═" * 60
+_CYAN_HLINE = f"{Colors.CYAN}{_HLINE}{Colors.RESET}"
+_DASH = "─" * 60
+
+
+@lru_cache(maxsize=1)
 def supports_color() -> bool:
-    """Check if terminal supports color output."""
+    """Check if terminal supports color output (checked once per run)."""
     if not hasattr(sys.stdout, "isatty"):
         return False
     if not sys.stdout.isatty():
@@ -60,132 +95,151 @@ def supports_color() -> bool:
     return True
 
 
-def colorize(text: str, color: str, use_color: bool = True) -> str:
-    """Apply color to text if supported."""
-    if not use_color:
-        return text
-    return f"{color}{text}{Colors.RESET}"
+def flush_output():
+    """Write out any buffered output."""
+    sys.stdout.flush()
 
 
-def format_status(status: Status, use_color: bool = True) -> str:
-    """Format a status with symbol and color."""
-    color, symbol = SYMBOLS[status]
-    if use_color:
-        return f"{color}{symbol}{Colors.RESET}"
-    return symbol
+def _colorize_ansi(text: str, color: str) -> str:
+    """Wrap text in a color; OutputContext.colorize when color is on."""
+    return f"{color}{text}{Colors.RESET}"
 
 
-def print_header(use_color: bool = True):
+def _colorize_plain(text: str, color: str) -> str:
+    """Return text unchanged; OutputContext.colorize when color is off."""
+    return text
+
+
+@dataclass(slots=True)
+class OutputContext:
+    """Per-run output settings, with the color-dependent strings resolved once."""
+    use_color: bool
+    write: Callable[[str], int]
+    writelines: Callable[[list[str]], None]
+    hline: str
+    status_symbols: dict[Status, str]
+    no_data: str
+    colorize: Callable[[str, str], str]
+
+    @classmethod
+    def create(cls, use_color: bool) -> "OutputContext":
+        """Build the context for a run writing to stdout."""
+        return cls(
+            use_color=use_color,
+            write=sys.stdout.write,
+            writelines=sys.stdout.writelines,
+            hline=_CYAN_HLINE if use_color else _HLINE,
+            status_symbols={
+                status: _STATUS_FORMATTED[(status, use_color)] for status in Status
+            },
+            no_data=_NO_DATA_COLOR if use_color else _NO_DATA_PLAIN,
+            colorize=_colorize_ansi if use_color else _colorize_plain,
+        )
+
+
+def print_header(ctx: OutputContext):
     """Print the main header."""
     now = datetime.now().strftime("%a %b %d, %Y %I:%M %p")
-    line = "═" * 60
+    title = ctx.colorize(f"  DAILY HUD - {now}", _TITLE_STYLE)
 
-    if use_color:
-        print(colorize(line, Colors.CYAN))
-        print(colorize(f"  DAILY HUD - {now}", Colors.BOLD + Colors.WHITE))
-        print(colorize(line, Colors.CYAN))
-    else:
-        print(line)
-        print(f"  DAILY HUD - {now}")
-        print(line)
-    print()
+    ctx.write(f"{ctx.hline}\n{title}\n{ctx.hline}\n\n")
 
 
-def print_section(name: str, use_color: bool = True):
-    """Print a section header."""
-    header = f"── {name} "
-    header = header + "─" * (60 - len(header))
+# Detail indents; details that already start with two spaces get two more
+_INDENT_2 = "  "
+_INDENT_4 = "    "
 
-    if use_color:
-        print(colorize(header, Colors.DIM))
-    else:
-        print(header)
 
+def _format_section(name: str, ctx: OutputContext) -> str:
+    """Format a section header line."""
+    return ctx.colorize(f"── {name} {_DASH[:max(0, 56 - len(name))]}", Colors.DIM)
 
-def print_result(result: CheckResult, use_color: bool = True, verbose: bool = False):
-    """Print a check result."""
-    symbol = format_status(result.status, use_color)
 
+def _format_result(result: CheckResult, ctx: OutputContext,
+                   verbose: bool) -> list[str]:
+    """
+    Format a check result as its status line followed by any detail lines,
+    each terminated by a newline.
+    """
     # Main status line
-    print(f"{symbol} {result.message}")
+    lines = [f"{ctx.status_symbols[result.status]} {result.message}\n"]
 
     # Details (only for non-OK or if verbose)
     if result.details and (result.status != Status.OK or verbose):
         for detail in result.details:
             # Indent details
-            if detail.startswith("  "):
-                print(f"  {detail}")
+            if detail.startswith(_INDENT_2):
+                lines.append(f"{_INDENT_2}{detail}\n")
             else:
-                print(f"    {detail}")
+                lines.append(f"{_INDENT_4}{detail}\n")
+
+    return lines
 
 
 def print_section_results(section_name: str, results: list[CheckResult],
-                          use_color: bool = True, verbose: bool = False):
-    """Print a complete section with all its results."""
-    print_section(section_name, use_color)
+                          ctx: OutputContext, verbose: bool = False):
+    """Print a complete section with all its results, in a single writelines."""
+    lines = [_format_section(section_name, ctx) + "\n"]
 
     if not results:
-        symbol = format_status(Status.UNKNOWN, use_color)
-        print(f"{symbol} No data available")
+        lines.append(ctx.no_data + "\n")
     else:
         for result in results:
-            print_result(result, use_color, verbose)
+            lines.extend(_format_result(result, ctx, verbose))
 
-    print()
+    lines.append("\n")
+    ctx.writelines(lines)
 
 
 def print_summary(results: list[CheckResult], elapsed_seconds: float,
-                  use_color: bool = True):
+                  ctx: OutputContext):
     """Print the summary footer."""
-    ok_count = sum(1 for r in results if r.status == Status.OK)
-    warn_count = sum(1 for r in results if r.status == Status.WARNING)
-    error_count = sum(1 for r in results if r.status == Status.ERROR)
+    status_counts = Counter(r.status for r in results)
+    ok_count = status_counts[Status.OK]
+    warn_count = status_counts[Status.WARNING]
+    error_count = status_counts[Status.ERROR]
     total = len(results)
-
-    line = "═" * 60
+    colorize = ctx.colorize
 
     # Build summary message
     parts = []
     if error_count > 0:
         msg = f"{error_count} error{'s' if error_count != 1 else ''}"
-        parts.append(colorize(msg, Colors.RED, use_color) if use_color else msg)
+        parts.append(colorize(msg, Colors.RED))
     if warn_count > 0:
         msg = f"{warn_count} warning{'s' if warn_count != 1 else ''}"
-        parts.append(colorize(msg, Colors.YELLOW, use_color) if use_color else msg)
+        parts.append(colorize(msg, Colors.YELLOW))
     if ok_count > 0 and (error_count > 0 or warn_count > 0):
         msg = f"{ok_count} OK"
-        parts.append(colorize(msg, Colors.GREEN, use_color) if use_color else msg)
+        parts.append(colorize(msg, Colors.GREEN))
 
     if not parts:
-        summary = colorize("All systems OK", Colors.GREEN, use_color)
+        summary = colorize("All systems OK", Colors.GREEN)
     else:
         summary = ", ".join(parts)
 
     timing = f"{total} checks in {elapsed_seconds:.1f}s"
 
-    print()
-    if use_color:
-        print(colorize(line, Colors.CYAN))
-    else:
-        print(line)
-    print(f"Summary: {summary} - {timing}")
-    if use_color:
-        print(colorize(line, Colors.CYAN))
-    else:
-        print(line)
+    ctx.write(f"\n{ctx.hline}\nSummary: {summary} - {timing}\n{ctx.hline}\n")
+    flush_output()
 
 
 def results_to_json(results: dict[str, list[CheckResult]]) -> dict:
-    """Convert results to JSON-serializable format."""
-    output = {}
-    for section, section_results in results.items():
-        output[section] = [
+    """
+    Convert results to JSON-serializable format.
+
+    Details lists are shared with the results rather than copied, since
+    the output is only serialized.
+    """
+    return {
+        section: [
             {
                 "name": r.name,
-                "status": r.status.value,
+                "status": r.status,
                 "message": r.message,
                 "details": r.details,
             }
             for r in section_results
         ]
-    return output
+        for section, section_results in results.items()
+    }
@@ -2,9 +2,27 @@
 1Password CLI integration for fetching secrets.
 """
 
+import hashlib
+import json
+import os
 import subprocess
 import shutil
-from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Optional
+
+
+# How long resolved secrets are kept in memory, for the life of the process
+MEMORY_CACHE_TTL_SECONDS = 300
+
+# The on-disk cache stores secrets in plaintext, so it is off unless the
+# user sets onepassword.cache_ttl_seconds
+DEFAULT_DISK_CACHE_TTL_SECONDS = 0
+CACHE_FILENAME = "secrets.json"
 
 
 class SecretsError(Exception):
@@ -12,13 +30,89 @@ class SecretsError(Exception):
     pass
 
 
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a live entry, marking it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expires_at = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Add or refresh an entry, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def ttl_cache(maxsize: int = 64, ttl: float = MEMORY_CACHE_TTL_SECONDS):
+    """
+    Like functools.lru_cache for single-argument functions, but entries
+    expire after ttl seconds so long-running callers pick up rotated secrets.
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize, ttl)
+        missing = object()
+
+        @wraps(func)
+        def wrapper(key):
+            value = cache.get(key, missing)
+            if value is missing:
+                value = func(key)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=1)
 def _check_op_available() -> bool:
     """Check if 1Password CLI is installed and available."""
     return shutil.which("op") is not None
 
 
+@lru_cache(maxsize=1)
 def _check_op_signed_in() -> bool:
     """Check if user is signed into 1Password CLI."""
+    # A manual `op signin` exports OP_SESSION_<account>; trust it rather
+    # than paying for another op startup
+    if any(key.startswith("OP_SESSION_") for key in os.environ):
+        return True
+
+    # Service accounts and Connect servers authenticate from the environment
+    # and list no accounts, so leave any auth error to op read/inject
+    if os.environ.get("OP_SERVICE_ACCOUNT_TOKEN") or (
+        os.environ.get("OP_CONNECT_HOST") and os.environ.get("OP_CONNECT_TOKEN")
+    ):
+        return True
+
     try:
         result = subprocess.run(
             ["op", "account", "list"],
@@ -31,7 +125,7 @@ def _check_op_signed_in() -> bool:
         return False
 
 
-@lru_cache(maxsize=64)
+@ttl_cache(maxsize=64)
 def get_secret(op_reference: str) -> str:
     """
     Fetch a secret from 1Password using an op:// reference.
@@ -55,26 +149,138 @@ def get_secret(op_reference: str) -> str:
         result = subprocess.run(
             ["op", "read", op_reference],
             capture_output=True,
-            text=True,
             timeout=30
         )
 
+        # Pipes are read as bytes; only the stream actually used is decoded
         if result.returncode != 0:
-            error_msg = result.stderr.strip() or "Unknown error"
+            error_msg = result.stderr.decode("utf-8", "replace").strip() or "Unknown error"
             if "not signed in" in error_msg.lower():
                 raise SecretsError("Not signed in to 1Password. Run 'op signin' first.")
             raise SecretsError(f"Failed to read secret: {error_msg}")
 
-        return result.stdout.strip()
+        try:
+            return result.stdout.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            raise SecretsError("Secret is not valid UTF-8")
 
     except subprocess.TimeoutExpired:
         raise SecretsError("Timeout waiting for 1Password CLI")
 
 
+def _get_secret_or_none(op_reference: str) -> Optional[str]:
+    """Fetch a secret, returning None instead of raising on failure."""
+    try:
+        return get_secret(op_reference)
+    except SecretsError:
+        # Store the error instead of failing completely
+        return None
+
+
+def _inject_secrets(references: dict[str, str]) -> Optional[dict[str, str]]:
+    """
+    Resolve several op:// references with a single `op inject` call.
+
+    Each reference is templated on its own line after a marker line, so
+    multi-line values survive the round trip.
+
+    Args:
+        references: Dictionary mapping secret names to op:// references.
+
+    Returns:
+        Dictionary mapping secret names to their values, or None if the
+        batch failed (op inject rejects the whole template on any bad
+        reference).
+    """
+    markers = {f"__SECRET_{i}__": name for i, name in enumerate(references)}
+    template = "".join(
+        f"{marker}\n{{{{ {references[name]} }}}}\n"
+        for marker, name in markers.items()
+    )
+
+    try:
+        result = subprocess.run(
+            ["op", "inject"],
+            input=template,
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+    except subprocess.TimeoutExpired:
+        return None
+
+    if result.returncode != 0:
+        return None
+
+    values = {}
+    current = None
+    for line in result.stdout.splitlines():
+        if line in markers:
+            current = markers[line]
+            values[current] = []
+        elif current:
+            values[current].append(line)
+
+    return {name: "\n".join(lines).strip() for name, lines in values.items()}
+
+
+def _cache_key(op_reference: str) -> str:
+    """Get the on-disk cache key for a reference, so references aren't stored."""
+    return hashlib.sha256(str(op_reference).encode()).hexdigest()
+
+
+def _read_disk_cache(path: Path, ttl: float) -> dict[str, dict]:
+    """Read the entries of the on-disk secrets cache younger than ttl seconds."""
+    now = time.time()
+    try:
+        with open(path, "r") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(entries, dict):
+        return {}
+
+    return {
+        key: entry for key, entry in entries.items()
+        if isinstance(entry, dict) and "v" in entry and now - entry.get("t", 0) < ttl
+    }
+
+
+def _write_disk_cache(path: Path, entries: dict[str, dict]):
+    """
+    Write the on-disk secrets cache atomically, readable only by the owner.
+
+    The temporary file is created with O_EXCL and mode 0600 and renamed
+    over the cache, so the secrets are never briefly world-readable.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path.unlink(missing_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 def get_secrets(config: dict) -> dict:
     """
     Fetch all secrets defined in config['secrets'].
 
+    All op:// references are resolved with one `op inject` call, paying the
+    CLI's startup and auth cost once; if that fails, the secrets are read
+    individually (concurrently, up to onepassword.max_workers at a time)
+    so one bad reference doesn't lose the others.
+
+    Resolved values are always kept in memory for the life of the process.
+    If onepassword.cache_ttl_seconds is set above 0 (the default is
+    disabled), they are also written in plaintext to a 0600 file in the
+    cache directory, so back-to-back runs don't call op at all.
+
     Args:
         config: The full configuration dictionary.
 
@@ -82,18 +288,78 @@ def get_secrets(config: dict) -> dict:
         Dictionary mapping secret names to their values.
     """
     secrets_config = config.get("secrets", {})
+    op_config = config.get("onepassword", {})
+    cache_config = config.get("cache", {})
     secrets = {}
 
+    # op subprocesses inherit the environment, so this also covers op read
+    # calls made later from the fallback pool. An explicit setting wins.
+    if op_config.get("biometric_unlock"):
+        os.environ.setdefault("OP_BIOMETRIC_UNLOCK_ENABLED", "true")
+
+    ttl = op_config.get("cache_ttl_seconds", DEFAULT_DISK_CACHE_TTL_SECONDS)
+    use_cache = ttl > 0 and cache_config.get("enabled", True)
+    cache_path = Path(
+        cache_config.get("directory", "~/.cache/daily-hud")
+    ).expanduser() / CACHE_FILENAME
+
+    # Serve what we can from the in-memory cache, then the on-disk one
+    cached = _read_disk_cache(cache_path, ttl) if use_cache else {}
     for name, reference in secrets_config.items():
-        try:
-            secrets[name] = get_secret(reference)
-        except SecretsError as e:
-            # Store the error instead of failing completely
-            secrets[name] = None
+        value = get_secret.cache.get(reference)
+        if value is None:
+            value = cached.get(_cache_key(reference), {}).get("v")
+        if value is not None:
+            secrets[name] = value
+    cache_hits = set(secrets)
+
+    # Only look for op at all if something wasn't cached, and skip the
+    # reads entirely when they would all fail for want of a session
+    missing = [name for name in secrets_config if name not in secrets]
+    if not missing or not _check_op_available() or not _check_op_signed_in():
+        secrets.update(dict.fromkeys(missing))
+        return secrets
+
+    references = {
+        name: secrets_config[name] for name in missing
+        if isinstance(secrets_config[name], str)
+        and secrets_config[name].startswith("op://")
+    }
+    if len(references) > 1:
+        for name, value in (_inject_secrets(references) or {}).items():
+            secrets[name] = value
+            get_secret.cache.set(references[name], value)
+
+    # Each op read mostly waits on CLI startup and the network, so run
+    # whatever the batch didn't resolve concurrently
+    remaining = [name for name in missing if name not in secrets]
+    if remaining:
+        max_workers = op_config.get("max_workers", 8)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(remaining))) as executor:
+            values = list(executor.map(
+                lambda name: _get_secret_or_none(secrets_config[name]), remaining
+            ))
+        secrets.update(zip(remaining, values))
+
+    if use_cache:
+        now = time.time()
+        resolved = {
+            _cache_key(secrets_config[name]): {"v": value, "t": now}
+            for name, value in secrets.items()
+            if value is not None and name not in cache_hits
+        }
+        if resolved:
+            _write_disk_cache(cache_path, {**cached, **resolved})
 
     return secrets
 
 
-def clear_cache():
-    """Clear the secrets cache."""
+def clear_cache(cache_dir: str = "~/.cache/daily-hud"):
+    """Clear the in-memory and on-disk secrets caches."""
     get_secret.cache_clear()
+    _check_op_available.cache_clear()
+    _check_op_signed_in.cache_clear()
+    try:
+        (Path(cache_dir).expanduser() / CACHE_FILENAME).unlink(missing_ok=True)
+    except OSError:
+        pass
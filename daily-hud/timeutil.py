@@ -0,0 +1,38 @@
+"""
+Timestamp parsing helpers shared by the check modules.
+"""
+
+import sys
+from datetime import datetime
+from functools import lru_cache
+
+# ciso8601 is a much faster C parser for RFC 3339 timestamps
+try:
+    from ciso8601 import parse_rfc3339
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
+# fromisoformat() accepts a trailing Z natively from Python 3.11
+_NATIVE_Z = sys.version_info >= (3, 11)
+
+
+@lru_cache(maxsize=1024)
+def parse_iso(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp, accepting a trailing Z for UTC.
+
+    Results are memoized, since API listings often repeat timestamps.
+
+    Raises:
+        ValueError: If the timestamp is malformed
+    """
+    if CISO8601_AVAILABLE:
+        try:
+            return parse_rfc3339(value)
+        except ValueError:
+            pass  # Not strict RFC 3339, let fromisoformat try
+
+    if not _NATIVE_Z and value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)